@@ -1,11 +1,28 @@
-import os
 from iopy.core.globals import DATA_FOLDER as __DATA_FOLDER
 from iopy.core.globals import IS_WINDOWS as __IS_WINDOWS
 from iopy.core.globals import FILES_LOG as __FILES_LOG
-from iopy.core.oecd import OECD
-from iopy.core.figaro import Figaro
-from iopy.core.exiobase import ExioBase
-from iopy.core.utils import remove_downloaded_files
+from importlib import import_module as __import_module
+
+# Attributes imported on first access (PEP 562), so that importing iopy does not import pandas, matplotlib etc.
+_lazy_attributes = {'OECD': 'iopy.core.oecd',
+                    'Figaro': 'iopy.core.figaro',
+                    'ExioBase': 'iopy.core.exiobase',
+                    'Panel': 'iopy.core.panel',
+                    'remove_downloaded_files': 'iopy.core.utils'}
+
+__all__ = list(_lazy_attributes) + ['get_size_data_folder']
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(__import_module(_lazy_attributes[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
 
 
 def get_size_data_folder():
@@ -32,9 +49,3 @@ def get_size_data_folder():
         tot_size = sum(f.stat().st_size for f in root_directory.glob('**/*') if f.is_file())
         return human(tot_size)
     return get_size(__DATA_FOLDER)
-
-
-if not os.path.exists(__DATA_FOLDER):
-    os.mkdir(__DATA_FOLDER)
-
-del os
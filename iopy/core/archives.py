@@ -0,0 +1,103 @@
+"""  Created on 17/10/2026::
+------------- archives -------------
+**Authors**: W. Wakker
+
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+from zipfile import ZipFile
+import threading
+import weakref
+import os
+
+_archives = {}
+# Number of live instances holding each archive, see hold_archive
+_holders = {}
+# Reentrant, as the finalizers of hold_archive can run during garbage collection while the lock is held
+_lock = threading.RLock()
+
+
+def get_archive(path: str):
+    """Get an open zip archive, which stays open and is shared by all instances loading data from it. The archive is
+    reopened if the file changed on the hard drive.
+
+    Args:
+        path: Path of the zip file
+
+    Returns:
+        ZipFile: Archive opened for reading
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _lock:
+        if path in _archives:
+            archive_stat, archive = _archives[path]
+            if (archive_stat.st_size, archive_stat.st_mtime) == (stat.st_size, stat.st_mtime):
+                return archive
+            archive.close()
+        archive = ZipFile(path, 'r')
+        _archives[path] = (stat, archive)
+        return archive
+
+
+def close_archive(path: Optional[str] = None):
+    """Close an open archive, e.g. before it is downloaded again
+
+    Args:
+        path: Path of the zip file, all archives are closed if None
+    """
+    with _lock:
+        paths = list(_archives) if path is None else [os.path.abspath(path)]
+        for p in paths:
+            if p in _archives:
+                _archives.pop(p)[1].close()
+
+
+def hold_archive(path: str, owner):
+    """Keep an archive available to an instance, the archive is closed once all instances holding it are garbage
+    collected
+
+    Args:
+        path: Path of the zip file
+        owner: Instance using the archive, e.g. a loader
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        _holders[path] = _holders.get(path, 0) + 1
+    weakref.finalize(owner, _release, path)
+
+
+def _release(path: str):
+    with _lock:
+        _holders[path] -= 1
+        if _holders[path] > 0:
+            return
+        del _holders[path]
+        if path in _archives:
+            _archives.pop(path)[1].close()
+
+
+def read_members(path: str,
+                 members: Iterable[str],
+                 parse: Callable,
+                 max_workers: Optional[int] = None):
+    """Decompress and parse several members of an archive in parallel threads
+
+    Args:
+        path: Path of the zip file
+        members: Names of the files in the archive
+        parse: Function that parses an open file, e.g. pandas.read_csv
+        max_workers: Maximum number of threads
+
+    Returns:
+        dict: Parsed result per member
+    """
+    archive = get_archive(path)
+
+    def read(member):
+        with archive.open(member, 'r') as file:
+            return parse(file)
+
+    members = list(members)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(members, executor.map(read, members)))
@@ -5,11 +5,14 @@
 """
 from warnings import warn
 from iopy.core.matrix import Matrix
+from iopy.core.solver import LUSolver, SparseSolver, WoodburySolver
+from iopy.core.cache import load_array, save_array
+from iopy.core.instrumentation import Spans, span, instrumented
 from iopy.core.utils import assert_is_subset
-import matplotlib.pyplot as plt
 from typing import Union, Iterable, Optional
 import numpy as np
 import pandas as pd
+from scipy import sparse as sp
 
 
 class IO:
@@ -17,7 +20,25 @@ class IO:
     class for classes that load IO data.
     """
 
-    def __init__(self):
+    def __init__(self,
+                 cache_key: Optional[str] = None,
+                 mmap: bool = False,
+                 sparse: Union[bool, str] = False,
+                 dtype: str = 'float64',
+                 refine: bool = False):
+        """
+
+        Args:
+            cache_key: Key under which the Leontief and Ghosh inverses are cached on the hard drive, see
+                       iopy.core.cache.cache_key; the inverses are not cached if None
+            mmap: Memory-map the cached inverses read-only instead of reading them into memory
+            sparse: Use sparse coefficient matrices and solvers for shocks; True or the solver method 'splu'
+                    (default), 'gmres', 'bicgstab' or 'neumann', see iopy.core.solver.SparseSolver
+            dtype: Floating point type of the matrices, 'float64' (default) or 'float32'; float32 halves the memory and
+                   roughly doubles the speed of the dense solves, at a relative accuracy of about 1e-6
+            refine: With dtype float32, refine the solutions of shocks with float64 residuals, so that only the rounding
+                    of the data to float32 (about 1e-7 relative) remains, see iopy.core.solver.LUSolver
+        """
         necessary_attrs = ['Z',
                            'X',
                            'V',
@@ -31,39 +52,148 @@ class IO:
                            'unit',
                            'demand_items']
         assert_is_subset(necessary_attrs, dir(self))
+        assert np.dtype(dtype) in {np.dtype('float32'), np.dtype('float64')}, "dtype must be float32 or float64"
+
+        self._dtype = np.dtype(dtype)
+        self._refine = refine
+        if self.Z.dtype != self._dtype:
+            for name in ['Z', 'X', 'V', 'FD', 'FD_REGION', 'FD_GRAN']:
+                if hasattr(self, name):
+                    setattr(self, name, getattr(self, name).astype(self._dtype))
+            self.ADD = {name: matrix.astype(self._dtype) for name, matrix in self.ADD.items()}
+
+        # Spans recorded by the loader are kept, see iopy.core.instrumentation
+        if getattr(self, 'spans', None) is None:
+            self.spans = Spans()
+
+        # Derived matrices are computed on first access, see the properties below
+        self._A = None
+        self._L = None
+        self._B = None
+        self._G = None
+        self._solvers = {}
+        self._linkages = None
+        self._inverse_cache_key = cache_key
+        self._mmap_mode = 'r' if mmap else None
+        self._sparse = 'splu' if sparse is True else sparse
+
+    def _solver(self, model: str):
+        """Get the solver for (I - A) or (I - B), which is created (and factorized) once on first use
 
-        # Coefficients matrix, replace 0 with 1 to allow inversion
-        x_filled = self.X.copy()
-        x_filled[x_filled == 0] = 1
+        Args:
+            model: leontief or ghosh
+
+        Returns:
+            LUSolver, or SparseSolver in sparse mode
+        """
+        if model not in {'leontief', 'ghosh'}:
+            raise ValueError('model must be leontief or ghosh')
+        if model not in self._solvers:
+            with span('factorize', spans=self.spans, model=model):
+                if self._sparse:
+                    self._solvers[model] = SparseSolver(self._sparse_coefficients(model), method=self._sparse)
+                else:
+                    self._solvers[model] = LUSolver(self.A if model == 'leontief' else self.B, refine=self._refine)
+        return self._solvers[model]
+
+    def _sparse_coefficients(self, model: str):
+        """Technical (leontief) or allocation (ghosh) coefficients as a sparse matrix, without building the dense one
+
+        Args:
+            model: leontief or ghosh
 
-        # Leontief demand side
-        self.A = Matrix('Technical coefficients',
-                        self.Z / x_filled.flatten(),
-                        self.Z.rows,
-                        self.Z.columns)
+        Returns:
+            scipy.sparse.csr_matrix
+        """
+        z = sp.csr_matrix(np.asarray(self.Z))
+        x_inv = sp.diags(1 / self._x_filled().flatten())
+        return (z @ x_inv if model == 'leontief' else x_inv @ z).tocsr()
 
-        self.L = Matrix('Leontief inverse',
-                        (np.eye(self.rs) - self.A).I,
-                        self.Z.rows,
-                        self.Z.columns)
+    def _inverse(self, model: str):
+        """Explicit Leontief or Ghosh inverse, read from the cache if available
 
-        # Ghosh supply side
-        self.B = Matrix('Allocation coefficients',
-                        self.Z / x_filled,
-                        self.Z.rows,
-                        self.Z.columns)
+        Args:
+            model: leontief or ghosh
 
-        self.G = Matrix('Output inverse',
-                        (np.eye(self.rs) - self.B).I,
-                        self.Z.rows,
-                        self.Z.columns)
+        Returns:
+            np.ndarray: Inverse
+        """
+        name = 'L' if model == 'leontief' else 'G'
+        if self._dtype != np.float64:
+            name += '_' + self._dtype.name
+        if self._inverse_cache_key is not None:
+            cached = load_array(self._inverse_cache_key, name, mmap_mode=self._mmap_mode)
+            # Inverses cached in another dtype are computed again, so float32 is kept on the cached and mmap paths
+            if cached is not None and cached[0].dtype == self._dtype:
+                return cached[0]
+
+        solver = self._solver(model)
+        with span('inverse', spans=self.spans, model=model):
+            inverse = solver.inverse()
+        if self._inverse_cache_key is not None:
+            save_array(self._inverse_cache_key, name, inverse, self.Z.rows, self.Z.columns)
+            if self._mmap_mode:
+                inverse = load_array(self._inverse_cache_key, name, mmap_mode=self._mmap_mode)[0]
+        return inverse
+
+    def _x_filled(self):
+        """Output vector with 0 replaced by 1 to allow inversion
 
+        Returns:
+            Matrix: Output
+        """
+        x_filled = self.X.copy()
+        x_filled[x_filled == 0] = 1
+        return x_filled
+
+    @property
+    def A(self):
+        """Matrix: Technical coefficients (Leontief demand side), computed on first access"""
+        if self._A is None:
+            self._A = Matrix('Technical coefficients',
+                             self.Z / self._x_filled().flatten(),
+                             self.Z.rows,
+                             self.Z.columns)
+        return self._A
+
+    @property
+    def L(self):
+        """Matrix: Leontief inverse, computed on first access from the LU factorization of (I - A)"""
+        if self._L is None:
+            self._L = Matrix('Leontief inverse',
+                             self._inverse('leontief'),
+                             self.Z.rows,
+                             self.Z.columns)
+        return self._L
+
+    @property
+    def B(self):
+        """Matrix: Allocation coefficients (Ghosh supply side), computed on first access"""
+        if self._B is None:
+            self._B = Matrix('Allocation coefficients',
+                             self.Z / self._x_filled(),
+                             self.Z.rows,
+                             self.Z.columns)
+        return self._B
+
+    @property
+    def G(self):
+        """Matrix: Ghosh inverse, computed on first access from the LU factorization of (I - B)"""
+        if self._G is None:
+            self._G = Matrix('Output inverse',
+                             self._inverse('ghosh'),
+                             self.Z.rows,
+                             self.Z.columns)
+        return self._G
+
+    @instrumented('shock')
     def _shock(self,
                model: str,
                shock: Union[int, float, None] = None,
                regions: Optional[Iterable] = None,
                sectors: Optional[Iterable] = None,
-               custom_shock_vector: Optional[Iterable] = None):
+               custom_shock_vector: Optional[Iterable] = None,
+               solver=None):
         """Calculates new output using Leontief or Ghosh model
 
         Args:
@@ -73,10 +203,33 @@ class IO:
             sectors: List of sectors to be shocked
             custom_shock_vector: Vector of length regions * sectors with percentage shocks, overrides all other shock
                                  parameters if supplied
+            solver: Solver for changed coefficients, see updated_solver
 
         Returns:
             Matrix: Shocked output
         """
+        shock_vector = self._shock_vector(shock=shock, regions=regions, sectors=sectors,
+                                          custom_shock_vector=custom_shock_vector)
+
+        return self._propagate(model, shock_vector, solver=solver)
+
+    def _shock_vector(self,
+                      shock: Union[int, float, None] = None,
+                      regions: Optional[Iterable] = None,
+                      sectors: Optional[Iterable] = None,
+                      custom_shock_vector: Optional[Iterable] = None):
+        """Creates a shock vector as a fraction from a shock in percentages
+
+        Args:
+            shock: Shock in percentage of original final demand or primary inputs
+            regions: List of regions to be shocked
+            sectors: List of sectors to be shocked
+            custom_shock_vector: Vector of length regions * sectors with percentage shocks, overrides all other shock
+                                 parameters if supplied
+
+        Returns:
+            np.ndarray: Shock vector of shape (rs, 1)
+        """
         if custom_shock_vector is not None:
             shock_vector = np.array(custom_shock_vector).reshape(self.rs, 1)
         else:
@@ -85,25 +238,164 @@ class IO:
             assert_is_subset(regions, self.regions)
             assert_is_subset(sectors, self.sectors)
 
-            shock_vector = np.array([shock if r in regions and s in sectors
-                                     else 0 for r, s in self.X.rows]).reshape(-1, 1)
+            shock_vector = np.where(self.X.row_index.mask(regions=regions, sectors=sectors),
+                                    shock, 0).reshape(-1, 1)
         shock_vector = shock_vector.astype('float64')
         shock_vector /= 100
+
+        return shock_vector
+
+    def _shock_matrix(self,
+                      shocks: Union[np.ndarray, Iterable]):
+        """Creates a shock matrix with one scenario per column
+
+        Args:
+            shocks: Array of shape (rs, k) with percentage shocks, or a list of (shock, regions, sectors) tuples
+
+        Returns:
+            np.ndarray: Shock matrix of shape (rs, k)
+        """
+        if isinstance(shocks, np.ndarray):
+            assert shocks.ndim == 2 and shocks.shape[0] == self.rs, "Shock matrix must be of shape (rs, k)"
+            return shocks.astype('float64') / 100
+
+        return np.hstack([self._shock_vector(shock=shock, regions=regions, sectors=sectors)
+                          for shock, regions, sectors in shocks])
+
+    def _propagate(self,
+                   model: str,
+                   shock_matrix: np.ndarray,
+                   solver=None):
+        """Calculates new output from one or more shock vectors using Leontief or Ghosh model
+
+        Args:
+            model: leontief or ghosh
+            shock_matrix: Shocks as fractions of shape (rs, k)
+            solver: Solver for changed coefficients, see updated_solver; the output before the shock then follows
+                    from the changed coefficients as well, instead of being X
+
+        Returns:
+            Matrix: Shocked output, one column per shock vector
+        """
+        if model not in {'leontief', 'ghosh'}:
+            raise ValueError('model must be leontief or ghosh')
+        if solver is not None:
+            if model == 'leontief':
+                return solver.solve(self.FD * (1 + shock_matrix))
+            return solver.solve(self.V.T * (1 + shock_matrix), trans=True)
+
         if model == 'leontief':
-            x_new = (self.L @ (self.FD * shock_vector)) + self.X
-        elif model == 'ghosh':
-            x_new = (self.G.T @ (self.V.T * shock_vector)) + self.X
+            x_new = self._solver(model).solve(self.FD * shock_matrix) + self.X
         else:
-            raise ValueError('model must be leontief or ghosh')
+            x_new = self._solver(model).solve(self.V.T * shock_matrix, trans=True) + self.X
 
         return x_new
 
+    def _base_output(self,
+                     model: str,
+                     solver=None):
+        """Output before a shock: X, or the output of the changed coefficients for the unchanged final demand (leontief)
+        or primary inputs (ghosh)
+
+        Args:
+            model: leontief or ghosh
+            solver: Solver for changed coefficients, see updated_solver
+
+        Returns:
+            np.ndarray: Output of length rs
+        """
+        if solver is None:
+            return self.X.flatten()
+        if model == 'leontief':
+            return np.asarray(solver.solve(self.FD)).flatten()
+        return np.asarray(solver.solve(self.V.T, trans=True)).flatten()
+
+    @instrumented('price_shock')
+    def _price_propagate(self,
+                         shock_matrix: np.ndarray,
+                         solver=None):
+        """Calculates price indices from one or more cost shocks with the Leontief price model p = (I - A')^-1 v,
+        where v are the value added (primary input) coefficients. The prices before the shock are 1.
+
+        Args:
+            shock_matrix: Shocks to the value added coefficients as fractions of shape (rs, k)
+            solver: Solver for changed technical coefficients, see updated_solver; v is not changed, so the prices
+                    before the shock follow from the changed coefficients as well and differ from 1, see _base_prices
+
+        Returns:
+            np.ndarray: Price indices, one column per shock vector
+        """
+        v = self._va_coefficients()
+        if solver is not None:
+            return np.asarray(solver.solve(v * (1 + shock_matrix), trans=True))
+
+        if 'leontief' not in self._solvers and self._L is not None:
+            # The transpose of an ndarray is a view, unlike Matrix.T which copies the inverse
+            return np.asarray(self._L).T @ (v * shock_matrix) + 1
+        return np.asarray(self._solver('leontief').solve(v * shock_matrix, trans=True)) + 1
+
+    def _va_coefficients(self):
+        """Value added coefficients v = V / x
+
+        Returns:
+            np.ndarray: Column vector
+        """
+        return (self.V.flatten() / self._x_filled().flatten()).reshape(-1, 1)
+
+    def _base_prices(self, solver=None):
+        """Price indices before a cost shock: 1, or (I - A_new')^-1 v for changed technical coefficients
+
+        Args:
+            solver: Solver for changed technical coefficients, see updated_solver
+
+        Returns:
+            np.ndarray: Price indices of length rs
+        """
+        if solver is None:
+            return np.ones(self.rs)
+        return np.asarray(solver.solve(self._va_coefficients(), trans=True)).flatten()
+
+    @instrumented('shock_batch')
+    def _batch_shock(self,
+                     model: str,
+                     shocks: Union[np.ndarray, Iterable],
+                     scenario_ids: Optional[Iterable] = None,
+                     as_frame: bool = True,
+                     solver=None):
+        """Executes a batch of Leontief demand or Ghosh supply shocks with a single multi-column solve
+
+        Args:
+            model: leontief or ghosh
+            shocks: Array of shape (rs, k) with percentage shocks, or a list of (shock, regions, sectors) tuples
+            scenario_ids: Identifiers of the k scenarios, 0 to k - 1 by default
+            as_frame: Return a long dataframe if true, otherwise an array of shape (rs, k)
+            solver: Solver for changed coefficients, see updated_solver
+
+        Returns:
+            pd.DataFrame: df with columns scenario, region, sector, x and x_new if as_frame is true, else np.ndarray
+        """
+        x_new = np.asarray(self._propagate(model, self._shock_matrix(shocks), solver=solver))
+        if not as_frame:
+            return x_new
+
+        k = x_new.shape[1]
+        scenario_ids = list(range(k)) if scenario_ids is None else list(scenario_ids)
+        assert len(scenario_ids) == k, "Number of scenario_ids must match the number of shocks"
+
+        return pd.DataFrame({'scenario': np.repeat(np.array(scenario_ids, dtype=object), self.rs),
+                             'region': np.tile(np.array([r for r, s in self.X.rows], dtype=object), k),
+                             'sector': np.tile(np.array([s for r, s in self.X.rows], dtype=object), k),
+                             'x': np.tile(self._base_output(model, solver), k),
+                             'x_new': x_new.flatten(order='F')})
+
     def _shock_to_df(self,
-                     x_new: Matrix):
+                     x_new: Matrix,
+                     x: Optional[np.ndarray] = None):
         """Creates a pandas dataframe with columns: region, sector, x and x_new
 
         Args:
             x_new: New output
+            x: Output before the shock, X if None
 
         Returns:
             pd.DataFrame
@@ -111,7 +403,7 @@ class IO:
 
         return pd.DataFrame({'region': [r for r, s in self.X.rows],
                              'sector': [s for r, s in self.X.rows],
-                             'x': self.X.flatten(),
+                             'x': self.X.flatten() if x is None else x,
                              'x_new': x_new.flatten()})
 
     def _shock_and_plot(self,
@@ -124,6 +416,7 @@ class IO:
                         plot_by: str = 'region',
                         plot_regions: Optional[Iterable] = None,
                         show: bool = True,
+                        solver=None,
                         ):
         """Executes a Leontief demand or Ghosh supply shock
 
@@ -138,28 +431,32 @@ class IO:
             plot_by: region or sector; if sector, the top 20 is shown
             plot_regions: List of regions to plot the effect for
             show: Show the plot if true
+            solver: Solver for changed coefficients, see updated_solver
 
         Returns:
             pd.DataFrame: df with shocked output vector if plot is False, else matplotlib fig, ax
         """
         x_new = self._shock(model=model, shock=shock, regions=regions, sectors=sectors,
-                            custom_shock_vector=custom_shock_vector)
+                            custom_shock_vector=custom_shock_vector, solver=solver)
+        x = self._base_output(model, solver)
 
         if plot:
             if plot_regions is None:
                 raise ValueError("Please specify 'plot_regions'")
-            fig, ax = self._plot_shock(x_new=x_new, model=model, by=plot_by, regions=plot_regions)
+            fig, ax = self._plot_shock(x_new=x_new, model=model, by=plot_by, regions=plot_regions, x=x)
             if show:
+                import matplotlib.pyplot as plt
                 plt.show()
             return fig, ax
 
-        return self._shock_to_df(x_new)
+        return self._shock_to_df(x_new, x)
 
     def _plot_shock(self,
                     x_new: Matrix,
                     model: str,
                     by: str,
-                    regions: Iterable):
+                    regions: Iterable,
+                    x: Optional[np.ndarray] = None):
         """Plot shock from a given new output
 
         Args:
@@ -167,14 +464,17 @@ class IO:
             model: ghosh or leontief
             by: region or sector
             regions: List of regions to plot the effect for
+            x: Output before the shock, X if None
 
         Returns:
             fig, ax
         """
+        import matplotlib.pyplot as plt
+
         assert by in {'region', 'sector'}, "plot_by must be 'region' or 'sector'"
         assert_is_subset(regions, self.regions)
 
-        df = self._shock_to_df(x_new)
+        df = self._shock_to_df(x_new, x)
         df['diff'] = (df.x_new / df.x - 1).fillna(0)
         df['col'] = self.V.flatten() if model == 'leontief' else self.FD.flatten()
         df['newcol'] = df['col'] * (1 + df['diff'])
@@ -215,6 +515,7 @@ class IO:
                               plot_by: str = 'region',
                               plot_regions: Optional[Iterable] = None,
                               show: bool = True,
+                              solver=None,
                               ):
         """Executes a Leontief demand shock
 
@@ -228,6 +529,8 @@ class IO:
             plot_by: region or sector; if sector, the top 20 is shown
             plot_regions: List of regions to plot the effect for
             show: Show the plot if true
+            solver: Solver for changed coefficients, see updated_solver; the output before the shock then follows
+                    from the changed coefficients as well
 
         Returns:
             pd.DataFrame: df with shocked output vector if plot is False, else matplotlib fig, ax
@@ -240,7 +543,8 @@ class IO:
                                     plot=plot,
                                     plot_by=plot_by,
                                     plot_regions=plot_regions,
-                                    show=show)
+                                    show=show,
+                                    solver=solver)
 
     def ghosh_supply_shock(self,
                            shock: Union[int, float, None] = None,
@@ -251,6 +555,7 @@ class IO:
                            plot_by: str = 'region',
                            plot_regions: Optional[Iterable] = None,
                            show: bool = True,
+                           solver=None,
                            ):
         """Executes a Ghosh supply shock
 
@@ -264,6 +569,8 @@ class IO:
             plot_by: region or sector; if sector, the top 20 is shown
             plot_regions: List of regions to plot the effect for
             show: Show the plot if true
+            solver: Solver for changed coefficients, see updated_solver; the output before the shock then follows
+                    from the changed coefficients as well
 
         Returns:
             pd.DataFrame: df with shocked output vector if plot is False, else matplotlib fig, ax
@@ -276,8 +583,226 @@ class IO:
                                     plot=plot,
                                     plot_by=plot_by,
                                     plot_regions=plot_regions,
-                                    show=show)
+                                    show=show,
+                                    solver=solver)
+
+    def leontief_demand_shock_batch(self,
+                                    shocks: Union[np.ndarray, Iterable],
+                                    scenario_ids: Optional[Iterable] = None,
+                                    as_frame: bool = True,
+                                    solver=None):
+        """Executes a batch of Leontief demand shocks, all scenarios are solved at once
+
+        Args:
+            shocks: Array of shape (rs, k) with percentage shocks to final demand, one scenario per column, or a list
+                    of (shock, regions, sectors) tuples
+            scenario_ids: Identifiers of the scenarios, 0 to k - 1 by default
+            as_frame: Return a long dataframe if true, otherwise an array of shape (rs, k)
+            solver: Solver for changed coefficients, see updated_solver
+
+        Returns:
+            pd.DataFrame: df with columns scenario, region, sector, x and x_new if as_frame is true, else np.ndarray
+        """
+        return self._batch_shock(model='leontief', shocks=shocks, scenario_ids=scenario_ids, as_frame=as_frame,
+                                 solver=solver)
+
+    def ghosh_supply_shock_batch(self,
+                                 shocks: Union[np.ndarray, Iterable],
+                                 scenario_ids: Optional[Iterable] = None,
+                                 as_frame: bool = True,
+                                 solver=None):
+        """Executes a batch of Ghosh supply shocks, all scenarios are solved at once
+
+        Args:
+            shocks: Array of shape (rs, k) with percentage shocks to primary inputs, one scenario per column, or a
+                    list of (shock, regions, sectors) tuples
+            scenario_ids: Identifiers of the scenarios, 0 to k - 1 by default
+            as_frame: Return a long dataframe if true, otherwise an array of shape (rs, k)
+            solver: Solver for changed coefficients, see updated_solver
 
+        Returns:
+            pd.DataFrame: df with columns scenario, region, sector, x and x_new if as_frame is true, else np.ndarray
+        """
+        return self._batch_shock(model='ghosh', shocks=shocks, scenario_ids=scenario_ids, as_frame=as_frame,
+                                 solver=solver)
+
+    def price_shock(self,
+                    shock: Union[int, float, None] = None,
+                    regions: Optional[Iterable] = None,
+                    sectors: Optional[Iterable] = None,
+                    custom_shock_vector: Optional[Iterable] = None,
+                    solver=None):
+        """Executes a cost-push shock with the Leontief price model: the costs of primary inputs (value added) per unit
+        of output change by a percentage and are passed on to all downstream prices
+
+        Args:
+            shock: Shock in percentage of original primary input costs
+            regions: List of regions to be shocked
+            sectors: List of sectors to be shocked
+            custom_shock_vector: Vector of length regions * sectors with percentage shocks, overrides all other shock
+                                 parameters if supplied
+            solver: Solver for changed technical coefficients, see updated_solver
+
+        Returns:
+            pd.DataFrame: df with columns region, sector, p (price index before the shock, 1 unless solver is given)
+                          and p_new
+        """
+        shock_vector = self._shock_vector(shock=shock, regions=regions, sectors=sectors,
+                                          custom_shock_vector=custom_shock_vector)
+        p_new = self._price_propagate(shock_vector, solver=solver)
+
+        return pd.DataFrame({'region': [r for r, s in self.X.rows],
+                             'sector': [s for r, s in self.X.rows],
+                             'p': self._base_prices(solver),
+                             'p_new': p_new.flatten()})
+
+    def price_shock_batch(self,
+                          shocks: Union[np.ndarray, Iterable],
+                          scenario_ids: Optional[Iterable] = None,
+                          as_frame: bool = True,
+                          solver=None):
+        """Executes a batch of cost-push shocks with the Leontief price model, all scenarios are solved at once
+
+        Args:
+            shocks: Array of shape (rs, k) with percentage shocks to primary input costs, one scenario per column, or
+                    a list of (shock, regions, sectors) tuples
+            scenario_ids: Identifiers of the scenarios, 0 to k - 1 by default
+            as_frame: Return a long dataframe if true, otherwise an array of shape (rs, k)
+            solver: Solver for changed technical coefficients, see updated_solver
+
+        Returns:
+            pd.DataFrame: df with columns scenario, region, sector, p and p_new if as_frame is true, else np.ndarray
+                          of p_new; p is the price index before the shock, 1 unless solver is given
+        """
+        p_new = self._price_propagate(self._shock_matrix(shocks), solver=solver)
+        if not as_frame:
+            return p_new
+
+        k = p_new.shape[1]
+        scenario_ids = list(range(k)) if scenario_ids is None else list(scenario_ids)
+        assert len(scenario_ids) == k, "Number of scenario_ids must match the number of shocks"
+
+        return pd.DataFrame({'scenario': np.repeat(np.array(scenario_ids, dtype=object), self.rs),
+                             'region': np.tile(np.array([r for r, s in self.X.rows], dtype=object), k),
+                             'sector': np.tile(np.array([s for r, s in self.X.rows], dtype=object), k),
+                             'p': np.tile(self._base_prices(solver), k),
+                             'p_new': p_new.flatten(order='F')})
+
+    def updated_solver(self,
+                       delta: Union[np.ndarray, sp.spmatrix],
+                       model: str = 'leontief'):
+        """Solver for changed technical (leontief) or allocation (ghosh) coefficients, e.g. when a supplier is replaced
+        in a few columns of A. The change is applied as a low-rank Woodbury update of the existing factorization of
+        (I - A) or (I - B), so that no new inverse is computed: a change in k columns (or rows) costs O(rs^2 k) instead
+        of O(rs^3). Pass the solver to the shock methods, or use its inverse() for the updated Leontief or Ghosh inverse.
+
+        Args:
+            delta: Change to A or B of shape (rs, rs), dense or scipy.sparse, nonzero in a few columns or rows only
+            model: leontief (change to A) or ghosh (change to B)
+
+        Returns:
+            WoodburySolver
+        """
+        delta = sp.csc_matrix(delta)
+        assert delta.shape == (self.rs, self.rs), "delta must be of shape (rs, rs)"
+        rows, columns = delta.nonzero()
+        rows, columns = np.unique(rows), np.unique(columns)
+
+        # delta = UV', with V (or U) selecting the changed columns (or rows)
+        if len(columns) <= len(rows):
+            U = delta[:, columns].toarray()
+            V = sp.csc_matrix((np.ones(len(columns)), (columns, np.arange(len(columns)))),
+                              shape=(self.rs, len(columns))).toarray()
+        else:
+            U = sp.csc_matrix((np.ones(len(rows)), (rows, np.arange(len(rows)))),
+                              shape=(self.rs, len(rows))).toarray()
+            V = delta[rows, :].toarray().T
+
+        return WoodburySolver(self._solver(model), U, V)
+
+    def linkages(self):
+        """Output multipliers, forward linkages, Rasmussen dispersion indices and value added multipliers, computed on
+        first call and kept on the instance.
+
+        No inverse is needed: the output multipliers m' = i'L and the value added multipliers v'L (v the value added
+        coefficients), split by the region where the value added is generated, come from one transposed solve with
+        (I - A), and the forward linkages Gi from one solve with (I - B). The backward and forward indices are the
+        multipliers and forward linkages divided by their mean, key sectors have both indices above 1. The total value
+        added multiplier is 1 when V is derived as X minus intermediate use, the domestic part shows how much of it
+        stays in the region itself.
+
+        Returns:
+            pd.DataFrame: df with columns region, sector, output_multiplier, forward_linkage, backward_index,
+                          forward_index, key_sector, va_multiplier and domestic_va_multiplier
+        """
+        if self._linkages is None:
+            region_codes = self.X.row_index.region_codes
+            va_coefficients = self.V.flatten() / self._x_filled().flatten()
+            rhs = np.zeros((self.rs, 1 + len(self.X.row_index.regions)))
+            rhs[:, 0] = 1
+            rhs[np.arange(self.rs), 1 + region_codes] = va_coefficients
+            backward = np.asarray(self._solver('leontief').solve(rhs, trans=True))
+            forward = np.asarray(self._solver('ghosh').solve(np.ones(self.rs))).flatten()
+            output_multiplier = backward[:, 0]
+
+            df = pd.DataFrame({'region': [r for r, s in self.X.rows],
+                               'sector': [s for r, s in self.X.rows],
+                               'output_multiplier': output_multiplier,
+                               'forward_linkage': forward,
+                               'backward_index': output_multiplier / output_multiplier.mean(),
+                               'forward_index': forward / forward.mean(),
+                               'va_multiplier': backward[:, 1:].sum(1),
+                               'domestic_va_multiplier': backward[np.arange(self.rs), 1 + region_codes]})
+            df.insert(6, 'key_sector', (df.backward_index > 1) & (df.forward_index > 1))
+            self._linkages = df
+        return self._linkages
+
+    def hypothetical_extraction(self,
+                                regions: Optional[Iterable] = None,
+                                sectors: Optional[Iterable] = None,
+                                joint: bool = False):
+        """Hypothetical extraction: remove the linkages of region-sectors, i.e. their rows and columns of A and their
+        final demand, and measure the loss of output with final demand of the other region-sectors unchanged.
+
+        No re-inversion is needed per candidate. By the Schur complement of the Leontief inverse L, extracting j alone
+        gives a loss of total output of x_j * m_j / L_jj, with m_j the column sum of L. Extracting a block J jointly
+        gives new output x - L[:, J] L[J, J]^-1 x_J. Only the columns of L of the candidates are needed, which are
+        taken from L if it was computed already and solved for otherwise.
+
+        Args:
+            regions: List of regions of the candidates, all regions if None
+            sectors: List of sectors of the candidates, all sectors if None
+            joint: Extract all candidates together instead of one by one
+
+        Returns:
+            pd.DataFrame: If joint is false, df with columns region, sector, x and loss, one row per candidate. If joint
+                          is true, df with columns region, sector, x and x_new for all region-sectors
+        """
+        if regions is not None:
+            assert_is_subset(regions, self.regions)
+        if sectors is not None:
+            assert_is_subset(sectors, self.sectors)
+        J = self.X.row_index.positions(regions=regions, sectors=sectors)
+        x = self.X.flatten().astype('float64')
+
+        if self._L is not None:
+            L_J = np.asarray(self.L[:, J], dtype='float64')
+        else:
+            E_J = np.zeros((self.rs, len(J)))
+            E_J[J, np.arange(len(J))] = 1
+            L_J = np.asarray(self._solver('leontief').solve(E_J), dtype='float64')
+
+        if joint:
+            x_new = x - L_J @ np.linalg.solve(L_J[J], x[J])
+            x_new[J] = 0
+            return self._shock_to_df(x_new)
+
+        return pd.DataFrame({'region': [self.X.rows[j][0] for j in J],
+                             'sector': [self.X.rows[j][1] for j in J],
+                             'x': x[J],
+                             'loss': x[J] * L_J.sum(0) / L_J[J, np.arange(len(J))]})
+
+    @instrumented('get_imports_exports')
     def get_imports_exports(self,
                             import_regions: Iterable,
                             export_regions: Iterable,
@@ -324,14 +849,123 @@ class IO:
             warn(f'There is overlap between import_regions and export_regions: '
                  f'{", ".join(set(import_regions).intersection(export_regions))}')
 
-        intermediate = float(self.Z[np.ix_([r in export_regions and s in export_sectors for r, s in self.Z.rows],
-                                           [r in import_regions and s in import_sectors for r, s in
-                                            self.Z.columns])].sum())
+        intermediate = float(self.Z[np.ix_(self.Z.row_index.positions(regions=export_regions, sectors=export_sectors),
+                                           self.Z.col_index.positions(regions=import_regions,
+                                                                      sectors=import_sectors))].sum())
 
-        final = float(
-            self.FD_REGION[np.ix_([r in export_regions and s in export_sectors for r, s in self.FD_REGION.rows],
-                                  [r in import_regions for r in self.FD_REGION.columns])].sum())
+        final = float(self.FD_REGION[np.ix_(self.FD_REGION.row_index.positions(regions=export_regions,
+                                                                              sectors=export_sectors),
+                                            self.FD_REGION.col_index.positions(regions=import_regions))].sum())
 
         return {'intermediate': intermediate,
                 'final': final,
                 'both': intermediate + final}[use_type]
+
+    def get_trade_matrix(self,
+                         use_type: str = 'both',
+                         by: str = 'region'):
+        """Get all trade flows between exporting and importing regions at once. Use is broken down by intermediate use
+           and final demand, specify 'use_type' to get either of them or both summed together.
+
+        Args:
+            use_type: 'intermediate', 'final', or 'both'
+            by: 'region' for a region by region table, or 'region-sector' for exporting region-sectors by importing
+                region
+
+        Returns:
+            pd.DataFrame: Trade flows with exporters in the rows and importing regions in the columns
+        """
+        assert use_type in {'intermediate', 'final', 'both'}, "use_type must be 'intermediate', 'final' or 'both'"
+        assert by in {'region', 'region-sector'}, "by must be 'region' or 'region-sector'"
+
+        if by == 'region':
+            export_index = pd.Index(self.Z.row_index.regions, name='export_region')
+        else:
+            export_index = pd.MultiIndex.from_tuples(self.Z.rows, names=['export_region', 'export_sector'])
+
+        def to_exporters(m):
+            # Sum the rows of m (region-sectors) by exporting region if needed
+            m = np.asarray(m)
+            return self.Z.row_index.aggregator() @ m if by == 'region' else m
+
+        flows = []
+        if use_type in {'intermediate', 'both'}:
+            # Sum the columns of Z by importing region
+            z_import = (self.Z.col_index.aggregator() @ np.asarray(self.Z).T).T
+            flows.append(pd.DataFrame(to_exporters(z_import),
+                                      index=export_index,
+                                      columns=pd.Index(self.Z.col_index.regions, name='import_region')))
+        if use_type in {'final', 'both'}:
+            fd_import = self.FD_REGION.col_index.aggregator() @ np.asarray(self.FD_REGION).T
+            flows.append(pd.DataFrame(to_exporters(fd_import.T),
+                                      index=export_index,
+                                      columns=pd.Index(self.FD_REGION.col_index.regions, name='import_region')))
+
+        df = flows[0]
+        for other in flows[1:]:
+            df = df.add(other, fill_value=0)
+        return df
+
+    def aggregate(self,
+                  region_map: Optional[dict] = None,
+                  sector_map: Optional[dict] = None):
+        """Aggregate regions and/or sectors into custom groupings, e.g. euro area vs rest of world or broad sectors.
+           Regions and sectors that are not in the mappings are kept as they are.
+
+        Args:
+            region_map: Mapping from region to aggregate region
+            sector_map: Mapping from sector to aggregate sector
+
+        Returns:
+            IO: New instance with aggregated Z, FD, FD_GRAN, FD_REGION, X and V
+        """
+        region_map = region_map or {}
+        sector_map = sector_map or {}
+
+        def relabel(label, map_sectors):
+            if isinstance(label, tuple):
+                r, s = label
+                return region_map.get(r, r), sector_map.get(s, s) if map_sectors else s
+            return region_map.get(label, label)
+
+        def aggregator(labels, map_sectors=True):
+            # New labels in order of first appearance and sparse matrix S, such that S @ M sums the rows of M
+            codes, uniques = pd.factorize(pd.Index([relabel(label, map_sectors) for label in labels],
+                                                   tupleize_cols=False))
+            return (uniques.to_list(),
+                    sp.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                  shape=(len(uniques), len(codes))))
+
+        rows, S = aggregator(self.Z.rows)
+        fd_gran_columns, S_fd_gran = aggregator(self.FD_GRAN.columns, map_sectors=False)
+        fd_region_columns, S_fd_region = aggregator(self.FD_REGION.columns)
+
+        def aggregate_matrix(m, S_rows, S_columns):
+            m = np.asarray(m)
+            if S_rows is not None:
+                m = S_rows @ m
+            if S_columns is not None:
+                m = (S_columns @ m.T).T
+            return m
+
+        io = IO.__new__(IO)
+        io.Z = Matrix(self.Z.info, aggregate_matrix(self.Z, S, S), rows, rows)
+        io.FD_GRAN = Matrix(self.FD_GRAN.info, aggregate_matrix(self.FD_GRAN, S, S_fd_gran), rows, fd_gran_columns)
+        io.FD = Matrix(self.FD.info, aggregate_matrix(self.FD, S, None), rows, self.FD.columns)
+        io.FD_REGION = Matrix(self.FD_REGION.info, aggregate_matrix(self.FD_REGION, S, S_fd_region),
+                              rows, fd_region_columns)
+        io.X = Matrix(self.X.info, aggregate_matrix(self.X, S, None), rows, self.X.columns)
+        io.V = Matrix(self.V.info, aggregate_matrix(self.V, None, S), self.V.rows, rows)
+        io.ADD = {}
+        io.rs = len(rows)
+        io.regions = list(sorted(set(r for r, s in rows)))
+        io.sectors = list(sorted(set(s for r, s in rows)))
+        io.sector_name_mapping = {s: self.sector_name_mapping.get(s, s) for s in io.sectors}
+        io.demand_items = self.demand_items
+        io.unit = self.unit
+        for attr in ['version', 'year', 'kind', 'reference', 'contact']:
+            if hasattr(self, attr):
+                setattr(io, attr, getattr(self, attr))
+        IO.__init__(io, sparse=self._sparse, dtype=self._dtype, refine=self._refine)
+
+        return io
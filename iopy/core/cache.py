@@ -0,0 +1,199 @@
+"""  Created on 17/10/2026::
+------------- cache -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.globals import CACHE_FOLDER
+from iopy.core.download import log_file
+from iopy.core.instrumentation import traced
+from typing import Optional
+import numpy as np
+import pandas as pd
+import json
+import os
+
+
+def cache_key(database: str, version: str, year: int, kind: Optional[str] = None):
+    """Create the key under which the tables of a database are cached
+
+    Args:
+        database: Database in lowercase, e.g. oecd, figaro or exiobase
+        version: Version of the data
+        year: Year
+        kind: industry-by-industry or product-by-product if applicable
+
+    Returns:
+        str: Key
+    """
+    return '_'.join(str(part) for part in [database, version, year, kind] if part is not None)
+
+
+def _paths(key: str, name: str):
+    base = os.path.join(CACHE_FOLDER, f'{key}__{name}')
+    return base + '.npy', base + '.json'
+
+
+def _source_stat(source: Optional[str]):
+    if source is None:
+        return None
+    stat = os.stat(source)
+    return [stat.st_size, stat.st_mtime]
+
+
+def _to_json_labels(labels):
+    return [list(label) if isinstance(label, tuple) else label for label in labels]
+
+
+def _from_json_labels(labels):
+    return [tuple(label) if isinstance(label, list) else label for label in labels]
+
+
+def _log(path: str, key: str):
+    # The key starts with the database name, see cache_key
+    log_file(key.split('_', 1)[0], path)
+
+
+@traced('save_cache')
+def save_array(key: str,
+               name: str,
+               array,
+               rows: list,
+               columns: list,
+               source: Optional[str] = None,
+               extra: Optional[dict] = None):
+    """Save a 2-dimensional array as .npy with its row and column labels in a .json metadata file
+
+    Args:
+        key: Cache key, see cache_key
+        name: Name of the table, e.g. Z or L
+        array: Numeric array, saved as float32 if it is float32 and as float64 otherwise
+        rows: Row labels
+        columns: Column labels
+        source: Downloaded file the array was parsed from, the cache is invalid once this file changes
+        extra: Any additional json serializable metadata
+    """
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    npy_path, json_path = _paths(key, name)
+    array = np.asarray(array)
+    dtype = np.float32 if array.dtype == np.float32 else np.float64
+    for path, write in [(npy_path, lambda f: np.save(f, np.ascontiguousarray(array, dtype=dtype))),
+                        (json_path, lambda f: f.write(json.dumps({'rows': _to_json_labels(rows),
+                                                                  'columns': _to_json_labels(columns),
+                                                                  'source': _source_stat(source),
+                                                                  'extra': extra or {}}).encode()))]:
+        # Write to a temporary file first so an interrupted write never leaves a valid looking cache
+        with open(path + '.tmp', 'wb') as f:
+            write(f)
+        os.replace(path + '.tmp', path)
+        _log(path, key)
+
+
+@traced('read_cache')
+def load_array(key: str,
+               name: str,
+               source: Optional[str] = None,
+               mmap_mode: Optional[str] = None):
+    """Load an array saved with save_array
+
+    Args:
+        key: Cache key, see cache_key
+        name: Name of the table, e.g. Z or L
+        source: Downloaded file the array was parsed from, returns None if it changed since the array was saved
+        mmap_mode: Memory-map the array instead of reading it into memory, e.g. 'r', see numpy.load
+
+    Returns:
+        tuple: array, rows, columns and extra metadata, or None if not cached
+    """
+    npy_path, json_path = _paths(key, name)
+    if not (os.path.isfile(npy_path) and os.path.isfile(json_path)):
+        return None
+    with open(json_path, 'r') as f:
+        meta = json.load(f)
+    if source is not None and meta['source'] != _source_stat(source):
+        return None
+    return (np.load(npy_path, mmap_mode=mmap_mode),
+            _from_json_labels(meta['rows']),
+            _from_json_labels(meta['columns']),
+            meta['extra'])
+
+
+def is_cached(key: str,
+              name: str,
+              source: Optional[str] = None):
+    """Check if an array is cached, without loading it
+
+    Args:
+        key: Cache key, see cache_key
+        name: Name of the table
+        source: Downloaded file the array was parsed from, returns False if it changed since the array was saved
+
+    Returns:
+        bool
+    """
+    npy_path, json_path = _paths(key, name)
+    if not (os.path.isfile(npy_path) and os.path.isfile(json_path)):
+        return False
+    with open(json_path, 'r') as f:
+        meta = json.load(f)
+    return source is None or meta['source'] == _source_stat(source)
+
+
+def save_frame(key: str,
+               name: str,
+               df: pd.DataFrame,
+               source: Optional[str] = None):
+    """Save a numeric dataframe, see save_array
+
+    Args:
+        key: Cache key, see cache_key
+        name: Name of the table
+        df: Numeric dataframe
+        source: Downloaded file the dataframe was parsed from
+    """
+    save_array(key, name, df.to_numpy(dtype='float64'), df.index.to_list(), df.columns.to_list(),
+               source=source,
+               extra={'index_names': list(df.index.names), 'columns_names': list(df.columns.names)})
+
+
+def load_frame(key: str,
+               name: str,
+               source: Optional[str] = None,
+               mmap_mode: Optional[str] = None):
+    """Load a dataframe saved with save_frame
+
+    Args:
+        key: Cache key, see cache_key
+        name: Name of the table
+        source: Downloaded file the dataframe was parsed from, returns None if it changed since it was saved
+        mmap_mode: Memory-map the data instead of reading it into memory, e.g. 'r', see numpy.load
+
+    Returns:
+        pd.DataFrame: df, or None if not cached
+    """
+    cached = load_array(key, name, source=source, mmap_mode=mmap_mode)
+    if cached is None:
+        return None
+    array, rows, columns, extra = cached
+
+    def to_index(labels, names):
+        if len(names) > 1:
+            return pd.MultiIndex.from_tuples(labels, names=names)
+        return pd.Index(labels, name=names[0])
+
+    return pd.DataFrame(array,
+                        index=to_index(rows, extra['index_names']),
+                        columns=to_index(columns, extra['columns_names']),
+                        copy=False)
+
+
+def clear(key: str):
+    """Remove all cached files for a key
+
+    Args:
+        key: Cache key, see cache_key
+    """
+    if not os.path.isdir(CACHE_FOLDER):
+        return
+    for file in os.listdir(CACHE_FOLDER):
+        if file.startswith(key + '__'):
+            os.remove(os.path.join(CACHE_FOLDER, file))
@@ -0,0 +1,179 @@
+"""  Created on 17/10/2026::
+------------- download -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.config import config
+from iopy.core.globals import DATA_FOLDER, FILES_LOG
+from iopy.core.archives import close_archive
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+from zipfile import is_zipfile
+import threading
+import hashlib
+import time
+import re
+import os
+
+CHUNK_SIZE = 1024 * 1024
+FILE_EXTENSIONS = {'oecd': '.zip',
+                   'figaro': '.csv',
+                   'exiobase': '.zip'}
+
+# Serializes the check and append of log_file across the threads of prefetch
+_log_lock = threading.Lock()
+
+
+def data_source(database: str,
+                version: str,
+                year: int,
+                kind: Optional[str] = None):
+    """Url and local path of the file containing a year of a database
+
+    Args:
+        database: oecd, figaro or exiobase
+        version: Version of the data
+        year: Year
+        kind: industry-by-industry or product-by-product for figaro and exiobase
+
+    Returns:
+        tuple: url, path
+    """
+    links = config[database][version]['links']
+    url = links[kind][year] if kind is not None else links[year]
+    file_id = re.search(config[database][version]['regex_id'], url).group(0)
+    return url, os.path.join(DATA_FOLDER, file_id + FILE_EXTENSIONS[database])
+
+
+def log_file(database: str, path: str):
+    """Add a file to the files log used by remove_downloaded_files, unless it is logged already
+
+    Args:
+        database: Database in lowercase, e.g. oecd
+        path: Path of the file
+    """
+    entry = database + ';' + path
+    with _log_lock:
+        # The data folder is created on the first download instead of when iopy is imported
+        os.makedirs(os.path.dirname(FILES_LOG), exist_ok=True)
+        if os.path.exists(FILES_LOG):
+            with open(FILES_LOG, 'r') as files_log:
+                if any(line.rstrip('\n') == entry for line in files_log):
+                    return
+        with open(FILES_LOG, 'a') as files_log:
+            files_log.write(entry + '\n')
+
+
+def _total_size(response, offset: int):
+    # Size of the complete file according to the server, None if unknown
+    if response.status_code == 206 and '/' in response.headers.get('Content-Range', ''):
+        total = response.headers['Content-Range'].rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+    if 'Content-Length' in response.headers:
+        return offset + int(response.headers['Content-Length'])
+    return None
+
+
+def download(url: str,
+             path: str,
+             database: str,
+             size: Optional[int] = None,
+             sha256: Optional[str] = None,
+             timeout: float = 60,
+             retries: int = 5,
+             chunk_size: int = CHUNK_SIZE):
+    """Download a file. Data is streamed into path + '.part', which is resumed with an HTTP Range request when the
+    connection drops and only renamed to path once complete and verified, so an interrupted download never leaves a
+    file behind that looks valid.
+
+    Args:
+        url: Url
+        path: Local path
+        database: Database in lowercase, used to track the file in the files log
+        size: Expected size in bytes, the size reported by the server is checked if None
+        sha256: Expected sha256 hex digest, not checked if None
+        timeout: Timeout in seconds for connecting and between received chunks
+        retries: Number of times to retry (resume) after a dropped connection or incomplete download
+        chunk_size: Size of the streamed chunks in bytes
+
+    Returns:
+        str: path
+    """
+    import requests
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part = path + '.part'
+    total = None
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        try:
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            with requests.get(url, stream=True, timeout=timeout, headers=headers) as r:
+                if r.status_code == 416:
+                    # Nothing left to download
+                    break
+                r.raise_for_status()
+                if r.status_code != 206:
+                    # Server does not support resuming, start over
+                    offset = 0
+                total = _total_size(r, offset)
+                with open(part, 'ab' if offset else 'wb') as f:
+                    for chunk in r.iter_content(chunk_size):
+                        f.write(chunk)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if attempt == retries:
+                raise e
+            time.sleep(min(2 ** attempt, 30))
+            continue
+        if total is None or os.path.getsize(part) >= total:
+            break
+    else:
+        raise IOError(f'Download of {url} incomplete after {retries} retries')
+
+    expected = size if size is not None else total
+    received = os.path.getsize(part)
+    if expected is not None and received != expected:
+        os.remove(part)
+        raise IOError(f'Downloaded file has {received} bytes, expected {expected}')
+    if sha256 is not None:
+        digest = hashlib.sha256()
+        with open(part, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        if digest.hexdigest() != sha256.lower():
+            os.remove(part)
+            raise IOError(f'Checksum of {url} does not match')
+    if path.lower().endswith('.zip') and not is_zipfile(part):
+        os.remove(part)
+        raise IOError(f'Downloaded file from {url} is not a valid zip file')
+
+    close_archive(path)
+    os.replace(part, path)
+    log_file(database, path)
+    return path
+
+
+def prefetch(items: Iterable[tuple],
+             refresh: bool = False,
+             max_workers: int = 4):
+    """Download the files of several databases, versions and years concurrently. Files containing several
+    of the requested years are downloaded once.
+
+    Args:
+        items: (database, version, year) or (database, version, year, kind) tuples
+        refresh: Download the files even if they exist on the hard drive
+        max_workers: Maximum number of concurrent downloads
+
+    Returns:
+        list: Paths of the downloaded files
+    """
+    sources = {}
+    for item in items:
+        database = item[0]
+        url, path = data_source(*item)
+        if refresh or not os.path.exists(path):
+            sources[path] = (url, database)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(download, url, path, database) for path, (url, database) in sources.items()]
+        return [future.result() for future in futures]
@@ -0,0 +1,209 @@
+"""  Created on 17/10/2026::
+------------- dynamic -------------
+**Authors**: W. Wakker
+
+Day by day propagation of supply and demand shocks in the style of the adaptive regional input-output (ARIO) model
+(Hallegatte, 2008; Guan et al., 2020). Every region-sector holds inventories of the products it uses, orders to
+replace what it used and to restore its inventories, and produces the minimum of its capacity, the demand for its
+products and what its inventories allow. Short production is rationed proportionally over all clients. Capacity can
+be increased temporarily (overproduction) when demand exceeds it.
+
+"""
+from iopy.core.base_io import IO
+from iopy.core.utils import assert_is_subset
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse as sp
+from typing import Iterable, Optional, Union
+import numpy as np
+
+RECORDS = {'x', 'demand', 'unmet'}
+
+# Model of the worker processes of ARIO.simulate_batch, set once per process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _simulate_worker(kwargs: dict):
+    return _worker_model.simulate(**kwargs)
+
+
+class ARIO:
+    """Adaptive regional input-output model on top of an IO instance. The state of all region-sectors is updated
+    at once in every step with vectorized NumPy operations on preallocated arrays.
+    """
+
+    def __init__(self,
+                 io: IO,
+                 inventory_days: Union[int, float, Iterable] = 90,
+                 inventory_tau: Union[int, float] = 6,
+                 psi: float = 0.8,
+                 overproduction: float = 1.25,
+                 overproduction_tau: Union[int, float] = 365,
+                 steps_per_year: int = 365,
+                 sparse: Optional[bool] = None):
+        """
+
+        Args:
+            io: IO instance, flows are read as annual flows
+            inventory_days: Target inventories in steps of use, one value or one per sector
+            inventory_tau: Number of steps over which a gap in inventories is ordered
+            psi: Production is constrained by inventories once they fall below psi times the target
+            overproduction: Maximum production capacity as a multiple of the capacity before the shock
+            overproduction_tau: Number of steps over which the overproduction capacity adapts
+            steps_per_year: Number of steps per year, 365 for daily steps
+            sparse: Store the matrices of trade shares as sparse matrices, follows the sparse option of io if None
+        """
+        assert 0 < psi <= 1, "psi must be between 0 and 1"
+        assert overproduction >= 1, "overproduction must be at least 1"
+
+        self.rows = io.X.rows
+        self.rs = io.rs
+        self.psi = psi
+        self.overproduction = overproduction
+        self.overproduction_tau = overproduction_tau
+        self.inventory_tau = inventory_tau
+        self.dt = 1 / steps_per_year
+        self._row_index = io.X.row_index
+
+        Z = np.asarray(io.Z, dtype='float64')
+        self.x0 = np.asarray(io.X, dtype='float64').flatten()
+        x_filled = io._x_filled().flatten().astype('float64')
+        # Final demand that keeps the economy in its steady state, i.e. including any statistical discrepancy
+        self.fd0 = self.x0 - Z.sum(1)
+
+        # Use of products (sectors) by each region-sector, and the share of each supplier in the use of a product
+        sector_codes = io.X.row_index.sector_codes
+        self.num_products = len(io.X.row_index.sectors)
+        self._product_rows = [np.flatnonzero(sector_codes == s) for s in range(self.num_products)]
+        Z_product = io.X.row_index.aggregator('sector') @ Z
+        self.A_product = Z_product / x_filled
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = [np.nan_to_num(Z[rows] / Z_product[s]) for s, rows in enumerate(self._product_rows)]
+        use_sparse = bool(io._sparse) if sparse is None else sparse
+        self._shares = [sp.csr_matrix(share) if use_sparse else share for share in shares]
+
+        inventory_days = np.broadcast_to(np.asarray(inventory_days, dtype='float64').reshape(-1, 1),
+                                         (self.num_products, 1))
+        self.inventory_target = inventory_days * self.dt * self.A_product * self.x0
+
+    def _path(self,
+              shock: Union[tuple, np.ndarray, None],
+              steps: int):
+        # Shock as fractions of shape (steps, rs) from a percentage vector of length rs, a (steps, rs) percentage path
+        # or a (shock, regions, sectors) tuple
+        if shock is None:
+            return np.zeros((1, self.rs))
+        if isinstance(shock, tuple):
+            shock, regions, sectors = shock
+            assert_is_subset(regions, self._row_index.regions)
+            assert_is_subset(sectors, self._row_index.sectors)
+            return np.where(self._row_index.mask(regions=regions, sectors=sectors), shock / 100, 0).reshape(1, -1)
+        shock = np.asarray(shock, dtype='float64') / 100
+        if shock.ndim == 2:
+            assert shock.shape == (steps, self.rs), "Shock path must be of shape (steps, rs)"
+            return shock
+        return shock.reshape(1, self.rs)
+
+    def simulate(self,
+                 steps: int,
+                 capacity: Union[tuple, np.ndarray, None] = None,
+                 demand: Union[tuple, np.ndarray, None] = None,
+                 recovery: Optional[int] = None,
+                 record: str = 'x'):
+        """Simulate a capacity and/or final demand shock step by step
+
+        Args:
+            steps: Number of steps
+            capacity: Loss of production capacity in percentages, a vector of length rs, an array of shape
+                      (steps, rs) with the loss in every step, or a (shock, regions, sectors) tuple
+            demand: Change of final demand in percentages, same options as capacity
+            recovery: Number of steps over which a constant capacity loss recovers linearly, permanent if None
+            record: Variable to return, 'x' for production, 'demand' for total demand (intermediate and final) or
+                    'unmet' for final demand that is not delivered, all as annual rates
+
+        Returns:
+            np.ndarray: Array of shape (steps + 1, rs), the first row is the state before the shock
+        """
+        if record not in RECORDS:
+            raise ValueError(f'record must be one of {sorted(RECORDS)}')
+
+        capacity_loss = self._path(capacity, steps)
+        if recovery is not None and capacity_loss.shape[0] == 1:
+            capacity_loss = capacity_loss * np.clip(1 - np.arange(steps) / recovery, 0, 1).reshape(-1, 1)
+        demand_change = self._path(demand, steps)
+
+        # State and work arrays, allocated once
+        x = self.x0.copy()
+        alpha = np.ones(self.rs)
+        inventory = self.inventory_target.copy()
+        orders = np.empty((self.num_products, self.rs))
+        total_demand = np.empty(self.rs)
+        fill_rate = np.empty(self.rs)
+        limit = np.empty(self.rs)
+        result = np.empty((steps + 1, self.rs))
+        result[0] = {'x': self.x0, 'demand': self.x0, 'unmet': np.zeros(self.rs)}[record]
+
+        # Production allowed by the inventory of each input, unused inputs never constrain production
+        used = self.inventory_target > 0
+        input_ratio = np.divide(self.x0, self.psi * self.inventory_target, out=np.zeros_like(inventory), where=used)
+        unused = np.where(used, 0, np.inf)
+
+        for t in range(steps):
+            final_demand = self.fd0 * (1 + demand_change[min(t, len(demand_change) - 1)])
+
+            # Orders to replace the inputs used in the previous step and to close the gap in inventories
+            np.multiply(self.A_product, x, out=orders)
+            orders += np.maximum(self.inventory_target - inventory, 0) / (self.inventory_tau * self.dt)
+            for s, rows in enumerate(self._product_rows):
+                total_demand[rows] = self._shares[s] @ orders[s]
+            total_demand += final_demand
+
+            # Production is the minimum of capacity, demand and what the scarcest input allows
+            np.multiply(self.x0, alpha * (1 - capacity_loss[min(t, len(capacity_loss) - 1)]), out=x)
+            np.minimum(x, total_demand, out=x)
+            np.min(inventory * input_ratio + unused, axis=0, initial=np.inf, out=limit)
+            np.minimum(x, limit, out=x)
+
+            # Proportional rationing of all orders, deliveries of each product to each client
+            np.divide(x, total_demand, out=fill_rate, where=total_demand > 0)
+            fill_rate[total_demand <= 0] = 1
+            for s, rows in enumerate(self._product_rows):
+                inventory[s] += (orders[s] * (self._shares[s].T @ fill_rate[rows]) - self.A_product[s] * x) * self.dt
+            np.maximum(inventory, 0, out=inventory)
+
+            # Overproduction capacity grows while demand exceeds production and returns to 1 otherwise
+            short = total_demand > x * (1 + 1e-9)
+            alpha += np.where(short, self.overproduction - alpha, 1 - alpha) / self.overproduction_tau
+
+            if record == 'x':
+                result[t + 1] = x
+            elif record == 'demand':
+                result[t + 1] = total_demand
+            else:
+                result[t + 1] = final_demand * (1 - fill_rate)
+        return result
+
+    def simulate_batch(self,
+                       scenarios: Iterable[dict],
+                       max_workers: Optional[int] = None):
+        """Simulate several scenarios in parallel processes. The model is sent to every worker process once.
+
+        Args:
+            scenarios: Keyword arguments of simulate for each scenario, e.g. [{'steps': 365, 'capacity': shock}]
+            max_workers: Maximum number of worker processes, the number of processors by default; 1 runs all
+                         scenarios in the current process
+
+        Returns:
+            np.ndarray: Array of shape (scenarios, steps + 1, rs)
+        """
+        scenarios = list(scenarios)
+        if max_workers == 1:
+            results = [self.simulate(**scenario) for scenario in scenarios]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(self,)) as executor:
+                results = list(executor.map(_simulate_worker, scenarios))
+        return np.stack(results)
@@ -7,19 +7,24 @@ from iopy.core.matrix import Matrix
 from functools import lru_cache
 import numpy as np
 import pandas as pd
+from typing import Iterable, Optional, Union
 from tqdm import tqdm
-from zipfile import ZipFile
-import re
 import os
 from iopy.core.config import config
 from iopy.core.base_io import IO
+from iopy.core.instrumentation import Spans, Stages, instrumented, traced
 from warnings import warn
-from iopy.core.globals import DATA_FOLDER, FILES_LOG
+from iopy.core.globals import DATA_FOLDER
+from iopy.core.download import data_source, download
+from iopy.core.cache import cache_key, load_array, load_frame, save_array, save_frame, clear as clear_cache
+from iopy.core import extensions
+from iopy.core.archives import get_archive, close_archive, hold_archive
 from iopy.core.utils import remove_downloaded_files
 
 db_name = os.path.basename(__file__).rstrip('.py')
 
 
+@traced('labels')
 def process_df(df):
     return (df,
             df.index.tolist(),
@@ -33,7 +38,15 @@ class ExioBase(IO):
                  version: str,
                  year: int,
                  kind: str = 'industry-by-industry',
-                 refresh: bool = False):
+                 refresh: bool = False,
+                 cache: bool = True,
+                 cache_inverses: bool = False,
+                 mmap: bool = False,
+                 sparse: Union[bool, str] = False,
+                 dtype: str = 'float64',
+                 refine: bool = False,
+                 progress: bool = True,
+                 extension: Optional[str] = None):
         """
 
         Args:
@@ -41,6 +54,17 @@ class ExioBase(IO):
             year: Year from 1995 to 2022
             kind: industry-by-industry (default) or product-by-product
             refresh: Download the data even if it exists on the hard drive
+            cache: Save the parsed data in a binary cache on the hard drive and load it from there next time
+            cache_inverses: Also save the Leontief and Ghosh inverses in the cache once they are computed
+            mmap: Memory-map the cached data and inverses read-only instead of reading them into memory, so that
+                  processes loading the same data share one copy; implies cache and cache_inverses
+            sparse: Use sparse coefficient matrices and solvers for shocks; True or the solver method 'splu'
+                    (default), 'gmres', 'bicgstab' or 'neumann'
+            dtype: Floating point type of the matrices, 'float64' (default) or 'float32' to halve the memory
+            refine: With dtype float32, refine the solutions of shocks to float64 accuracy
+            progress: Show a progress bar
+            extension: Also load the stressor tables F and F_Y of an extension, 'satellite' or 'impacts', see
+                       load_extension
         """
 
         assert kind in {'industry-by-industry', 'product-by-product'}
@@ -57,20 +81,29 @@ class ExioBase(IO):
         self.version = version
         self.year = year
         self.kind = kind
-        self._url = config['exiobase'][version]['links'][kind][year]
-        self._file_id = re.search(config['exiobase'][version]['regex_id'], self._url).group(0)
-        self._data_file = os.path.join(DATA_FOLDER, self._file_id + '.zip')
+        self._url, self._data_file = data_source(db_name, version, year, kind)
+        self._file_id = os.path.splitext(os.path.basename(self._data_file))[0]
+        self._cache = cache or mmap
+        self._mmap_mode = 'r' if mmap else None
+        self._cache_key = cache_key(db_name, version, year, kind)
         file_exists = os.path.isfile(self._data_file)
         download = not file_exists or refresh
-        with tqdm(total=3 if download else 2) as pbar:
+        if download:
+            close_archive(self._data_file)
+            clear_cache(self._cache_key)
+        # The shared archive is closed once no instance uses it anymore
+        hold_archive(self._data_file, self)
+        self.spans = Spans()
+        with tqdm(total=3 if download else 2, disable=not progress) as pbar, \
+                Stages('load', self.spans, pbar) as stage:
             # Download
             if download:
-                pbar.set_description('Downloading data...')
+                stage('download', 'Downloading data...')
                 self._download_data()
                 pbar.update()
 
             # Load
-            pbar.set_description('Loading data...')
+            stage('parse', 'Loading data...')
             self.df = None
             self._Z_raw, self._FD_raw, self._X_raw, self._metadata, self._sector_codes, self._FD_codes = self._load_data()
 
@@ -92,7 +125,7 @@ class ExioBase(IO):
             pbar.update()
 
             # Create matrices
-            pbar.set_description('Creating matrices...')
+            stage('matrices', 'Creating matrices...')
             assert self._Z_raw.shape[0] == self._Z_raw.shape[1]
             self.rs = config['exiobase'][version]['num_regions'][kind] * config['exiobase'][version]['num_sectors'][kind]
             self.Z = Matrix('Intermediate use',
@@ -113,8 +146,12 @@ class ExioBase(IO):
                             columns=self.Z.columns)
 
             self.ADD = {}
+            self.F = None
+            self.F_Y = None
+            self.stressor_units = None
 
             # Create country level FD
+            stage('fd_region')
             fd_region = pd.DataFrame(self.FD_GRAN,
                                      columns=[r for r, s in self.FD_GRAN.columns]).T
             fd_region.index.name = 'region'
@@ -131,7 +168,16 @@ class ExioBase(IO):
             self.demand_items = exiobase_FD_name_mapping
             self.reference = 'EXIOBASE3'
             self.contact = 'https://www.exiobase.eu/index.php/about-us/contact-us'
-            super().__init__()
+            stage('init')
+            super().__init__(cache_key=self._cache_key if self._cache and (cache_inverses or mmap) else None,
+                             mmap=mmap,
+                             sparse=sparse,
+                             dtype=dtype,
+                             refine=refine)
+
+            if extension is not None:
+                stage('extension', 'Loading extension...')
+                self.load_extension(extension)
 
             pbar.update()
             pbar.set_description('Done')
@@ -139,49 +185,145 @@ class ExioBase(IO):
     @lru_cache()
     def _load_data(self):
         folder = f'IOT_{self.year}_{"ixi" if self.kind == "industry-by-industry" else "pxp"}'
-        with ZipFile(self._data_file, 'r') as zf:
+        tables = {}
+        if self._cache:
+            for name in ['Z', 'Y', 'x']:
+                tables[name] = load_frame(self._cache_key, name, source=self._data_file, mmap_mode=self._mmap_mode)
+            if any(table is None for table in tables.values()):
+                tables = {}
+
+        zf = get_archive(self._data_file)
+        if not tables:
             with zf.open(f'{folder}/Z.txt', 'r') as txt_file:
-                z_raw = pd.read_csv(txt_file,
-                                    header=[0, 1],
-                                    index_col=[0, 1],
-                                    sep='\t')
+                tables['Z'] = pd.read_csv(txt_file,
+                                          header=[0, 1],
+                                          index_col=[0, 1],
+                                          sep='\t')
 
             with zf.open(f'{folder}/Y.txt', 'r') as txt_file:
-                fd_raw = pd.read_csv(txt_file,
-                                     header=[0, 1],
-                                     index_col=[0, 1],
-                                     sep='\t')
+                tables['Y'] = pd.read_csv(txt_file,
+                                          header=[0, 1],
+                                          index_col=[0, 1],
+                                          sep='\t')
 
             with zf.open(f'{folder}/x.txt', 'r') as txt_file:
-                x_raw = pd.read_csv(txt_file,
-                                    sep='\t',
-                                    index_col=[0, 1])
+                tables['x'] = pd.read_csv(txt_file,
+                                          sep='\t',
+                                          index_col=[0, 1])
+
+            if self._cache:
+                clear_cache(self._cache_key)
+                for name, table in tables.items():
+                    save_frame(self._cache_key, name, table, source=self._data_file)
+                    if self._mmap_mode:
+                        tables[name] = load_frame(self._cache_key, name, mmap_mode=self._mmap_mode)
+        z_raw, fd_raw, x_raw = tables['Z'], tables['Y'], tables['x']
 
-            sector_file = 'industries' if self.kind == 'industry-by-industry' else 'products'
-            with zf.open(f'{folder}/{sector_file}.txt', 'r') as csv_file:
-                sector_codes = pd.read_csv(csv_file, sep='\t', index_col=1)
+        sector_file = 'industries' if self.kind == 'industry-by-industry' else 'products'
+        with zf.open(f'{folder}/{sector_file}.txt', 'r') as csv_file:
+            sector_codes = pd.read_csv(csv_file, sep='\t', index_col=1)
 
-            with zf.open(f'{folder}/finaldemands.txt', 'r') as csv_file:
-                FD_codes = pd.read_csv(csv_file, sep='\t', index_col=1)
+        with zf.open(f'{folder}/finaldemands.txt', 'r') as csv_file:
+            FD_codes = pd.read_csv(csv_file, sep='\t', index_col=1)
 
-            with zf.open(f'{folder}/metadata.json', 'r') as json_file:
-                metadata = pd.read_json(json_file)
+        with zf.open(f'{folder}/metadata.json', 'r') as json_file:
+            metadata = pd.read_json(json_file)
 
         return z_raw, fd_raw, x_raw, metadata, sector_codes, FD_codes
 
-    def _download_data(self):
-        import requests
+    @instrumented('load_extension')
+    def load_extension(self, name: str = 'satellite'):
+        """Load the stressor tables of an extension into F (stressors by region-sector) and F_Y (stressors of final
+        demand by the columns of FD_GRAN) and their units into stressor_units. The tables are streamed from the zip
+        file in chunks and cached like the other tables.
+
+        Args:
+            name: 'satellite' (default) for emissions, resources and employment or 'impacts' for characterized
+                  impacts
+        """
+        if name not in {'satellite', 'impacts'}:
+            raise ValueError("Extension selected not recognized. \n Please choose among ['satellite', 'impacts']")
+
+        folder = f'IOT_{self.year}_{"ixi" if self.kind == "industry-by-industry" else "pxp"}/{name}'
+        tables = {}
+        if self._cache:
+            for table in ['F', 'F_Y']:
+                tables[table] = load_array(self._cache_key, f'{name}_{table}',
+                                           source=self._data_file, mmap_mode=self._mmap_mode)
+            if any(cached is None for cached in tables.values()):
+                tables = {}
+
+        if not tables:
+            zf = get_archive(self._data_file)
+            with zf.open(f'{folder}/unit.txt', 'r') as txt_file:
+                units = pd.read_csv(txt_file, sep='\t', index_col=0).iloc[:, 0]
+            code_maps = {'F': self._sector_codes['CodeNr'].to_dict(), 'F_Y': self._FD_codes['CodeNr'].to_dict()}
+            for table, code_map in code_maps.items():
+                array, rows, columns = extensions.read_stressor_table(zf, f'{folder}/{table}.txt',
+                                                                      num_rows=len(units),
+                                                                      dtype=self._dtype)
+                columns = [(r, code_map[s]) for r, s in columns]
+                tables[table] = (array, rows, columns, {'units': units.to_list()})
+                if self._cache:
+                    save_array(self._cache_key, f'{name}_{table}', array, rows, columns,
+                               source=self._data_file, extra={'units': units.to_list()})
+                    if self._mmap_mode:
+                        tables[table] = load_array(self._cache_key, f'{name}_{table}', mmap_mode=self._mmap_mode)
+
+        matrices = {}
+        for table, expected in [('F', self.Z.columns), ('F_Y', self.FD_GRAN.columns)]:
+            array, rows, columns, extra = tables[table]
+            if columns != list(expected):
+                array = array[:, pd.Index(columns).get_indexer(expected)]
+            matrices[table] = Matrix(f'Stressors ({name})' if table == 'F' else f'Stressors of final demand ({name})',
+                                     array.astype(self._dtype, copy=False),
+                                     rows=rows,
+                                     columns=list(expected))
+        self.F, self.F_Y = matrices['F'], matrices['F_Y']
+        self.stressor_units = dict(zip(self.F.rows, tables['F'][3]['units']))
+
+    def _extension(self):
+        if self.F is None:
+            self.load_extension()
+        return self.F
+
+    def multipliers(self,
+                    stressors: Optional[Iterable] = None):
+        """Footprint multipliers S L, the stressors along the supply chain per unit of final demand of each
+        region-sector. Loads the satellite extension if no extension is loaded yet.
+
+        Args:
+            stressors: Subset of stressors, all if None
 
+        Returns:
+            pd.DataFrame: Multipliers with stressors in the rows and region-sectors in the columns
+        """
+        return extensions.multipliers(self, self._extension(), stressors=stressors)
+
+    def footprint(self,
+                  stressors: Optional[Iterable] = None,
+                  by: str = 'region',
+                  final_demand: bool = True):
+        """Consumption-based footprint S L Y. Loads the satellite extension if no extension is loaded yet.
+
+        Args:
+            stressors: Subset of stressors, all if None
+            by: 'region' for the final demand of each region, or 'region-sector' for the final products of each
+                region-sector
+            final_demand: Add the stressors emitted directly by final demand (F_Y), e.g. by households
+
+        Returns:
+            pd.DataFrame: Footprint with stressors in the rows and regions or region-sectors in the columns
+        """
+        return extensions.footprint(self, self._extension(), F_Y=self.F_Y if final_demand else None,
+                                    stressors=stressors, by=by)
+
+    def _download_data(self):
         try:
-            r = requests.get(self._url, stream=True)
-            with open(self._data_file, "wb") as f:
-                for chunk in r.iter_content(1024 * 5):
-                    f.write(chunk)
-            with open(FILES_LOG, 'a') as files_log:
-                files_log.write(db_name + ';' + self._data_file + '\n')
+            download(self._url, self._data_file, db_name)
         except Exception as e:
             warn(f"Couldn't download the data. Try downloading manually from {self._url} "
-                 f"and save the csv file as {self._file_id}.csv in {self._data_folder}")
+                 f"and save the zip file as {self._file_id}.zip in {DATA_FOLDER}")
             raise e
 
     @staticmethod
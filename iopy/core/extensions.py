@@ -0,0 +1,155 @@
+"""  Created on 17/10/2026::
+------------- extensions -------------
+**Authors**: W. Wakker
+
+Environmental and social extensions: stressor tables F (stressors by region-sector) and F_Y (stressors emitted directly
+by final demand) and consumption-based footprints S L Y, with S = F / x the stressor coefficients. Footprints are
+computed with multi-column solves of (I - A) instead of a dense Leontief inverse.
+
+"""
+from iopy.core.base_io import IO
+from iopy.core.instrumentation import traced
+from iopy.core.matrix import Matrix
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+import io as _io
+import warnings
+
+
+def _parse_line(values: str, num_columns: int):
+    # np.fromstring is about twice as fast as the pandas parser on these wide tables, but stops at empty cells
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        parsed = np.fromstring(values, sep='\t')
+    if len(parsed) != num_columns:
+        parsed = pd.to_numeric(pd.Series(values.rstrip('\r\n').split('\t')), errors='coerce').to_numpy()
+    return parsed
+
+
+@traced('read_stressors')
+def read_stressor_table(zf,
+                        path: str,
+                        num_rows: int,
+                        dtype: str = 'float64'):
+    """Read a stressor table with two header rows (region and sector or final demand category) and the stressors in the
+    first column from a zip archive. The table is streamed line by line into a preallocated array, so that neither the
+    text nor an intermediate frame of the whole table is held in memory.
+
+    Args:
+        zf: Opened zip archive
+        path: Path of the table in the archive, e.g. IOT_2022_ixi/satellite/F.txt
+        num_rows: Number of stressors in the table
+        dtype: Floating point type of the array
+
+    Returns:
+        tuple: array, stressors and column labels (region, sector or category)
+    """
+    with zf.open(path, 'r') as f:
+        text = _io.TextIOWrapper(f, encoding='utf-8')
+        header = [text.readline().rstrip('\r\n').split('\t')[1:] for _ in range(2)]
+        columns = list(zip(*header))
+
+        array = np.empty((num_rows, len(columns)), dtype=dtype)
+        rows = []
+        for line in text:
+            stressor, _, values = line.partition('\t')
+            # Tables written by pandas have an additional row with the name of the index and empty cells
+            if not rows and not values.strip('\t\r\n'):
+                continue
+            if len(rows) == num_rows:
+                raise ValueError(f'{path} has more than {num_rows} stressors')
+            array[len(rows)] = _parse_line(values, len(columns))
+            rows.append(stressor)
+
+    if len(rows) != num_rows:
+        raise ValueError(f'{path} has {len(rows)} stressors instead of {num_rows}')
+    return array, rows, columns
+
+
+def _select(F: Matrix,
+            stressors: Optional[Iterable]):
+    if stressors is None:
+        return F, list(F.rows)
+    stressors = list(stressors)
+    positions = pd.Index(F.rows).get_indexer(stressors)
+    if (positions < 0).any():
+        raise ValueError(f'Stressors not found: {[s for s, p in zip(stressors, positions) if p < 0]}')
+    return np.asarray(F)[positions], stressors
+
+
+def stressor_coefficients(io: IO,
+                          F: Matrix):
+    """Stressors per unit of output S = F / x
+
+    Args:
+        io: IO instance
+        F: Stressors with region-sectors in the columns
+
+    Returns:
+        np.ndarray: S
+    """
+    return np.asarray(F, dtype='float64') / io._x_filled().flatten()
+
+
+def multipliers(io: IO,
+                F: Matrix,
+                stressors: Optional[Iterable] = None):
+    """Footprint multipliers S L: total stressors along the supply chain per unit of final demand of each
+    region-sector, from one transposed solve with a column per stressor
+
+    Args:
+        io: IO instance
+        F: Stressors with region-sectors in the columns
+        stressors: Subset of stressors, all if None
+
+    Returns:
+        pd.DataFrame: Multipliers with stressors in the rows and region-sectors in the columns
+    """
+    F, stressors = _select(F, stressors)
+    S = stressor_coefficients(io, F)
+    return pd.DataFrame(np.asarray(io._solver('leontief').solve(S.T, trans=True), dtype='float64').T,
+                        index=pd.Index(stressors, name='stressor'),
+                        columns=pd.MultiIndex.from_tuples(io.X.rows, names=['region', 'sector']))
+
+
+def footprint(io: IO,
+              F: Matrix,
+              F_Y: Optional[Matrix] = None,
+              stressors: Optional[Iterable] = None,
+              by: str = 'region'):
+    """Consumption-based footprint S L Y of the final demand of each region, plus the stressors emitted directly by
+    final demand F_Y. For by='region' one solve with a column per consuming region suffices; by='region-sector' gives
+    the footprint of the final demand for the products of each region-sector instead and needs a column per stressor.
+
+    Args:
+        io: IO instance
+        F: Stressors with region-sectors in the columns
+        F_Y: Stressors of final demand with the columns of FD_GRAN, not added if None
+        stressors: Subset of stressors, all if None
+        by: 'region' for consuming regions, or 'region-sector' for the final products of region-sectors
+
+    Returns:
+        pd.DataFrame: Footprint with stressors in the rows and regions or region-sectors in the columns; for
+                      by='region-sector' the stressors of final demand are in column ('final_demand', 'direct')
+    """
+    assert by in {'region', 'region-sector'}, "by must be 'region' or 'region-sector'"
+    if by == 'region-sector':
+        df = multipliers(io, F, stressors) * io.FD.flatten()
+        if F_Y is not None:
+            # Direct final demand stressors are not attributed to products
+            df[('final_demand', 'direct')] = np.asarray(_select(F_Y, stressors)[0], dtype='float64').sum(1)
+        return df
+
+    F, stressors = _select(F, stressors)
+    S = stressor_coefficients(io, F)
+    output = np.asarray(io._solver('leontief').solve(np.asarray(io.FD_REGION)), dtype='float64')
+    df = pd.DataFrame(S @ output,
+                      index=pd.Index(stressors, name='stressor'),
+                      columns=pd.Index(io.FD_REGION.columns, name='region'))
+    if F_Y is not None:
+        F_Y_selected = _select(F_Y, stressors)[0]
+        direct = pd.DataFrame(np.asarray(F_Y_selected, dtype='float64'),
+                              columns=[r for r, c in F_Y.columns]).T.groupby(level=0).sum().T
+        df += direct.reindex(columns=df.columns, fill_value=0).to_numpy()
+    return df
@@ -8,18 +8,22 @@ from iopy.core.matrix import Matrix
 from functools import lru_cache
 import numpy as np
 import pandas as pd
+from typing import Union
 from tqdm import tqdm
-import re
 import os
 from iopy.core.config import config
 from warnings import warn
 from iopy.core.base_io import IO
-from iopy.core.globals import DATA_FOLDER, FILES_LOG
-from iopy.core.utils import remove_downloaded_files
+from iopy.core.instrumentation import Spans, Stages, span, traced
+from iopy.core.globals import DATA_FOLDER
+from iopy.core.download import data_source, download
+from iopy.core.cache import cache_key, load_frame, save_frame, clear as clear_cache
+from iopy.core.utils import remove_downloaded_files, single_block, frame_memory
 
 db_name = os.path.basename(__file__).rstrip('.py')
 
 
+@traced('labels')
 def process_df(df):
     if df.shape[0] > 1 and df.shape[1] > 1:
         return (df,
@@ -42,7 +46,15 @@ class Figaro(IO):
                  version: str,
                  year: int,
                  kind='industry-by-industry',
-                 refresh: bool = False):
+                 refresh: bool = False,
+                 cache: bool = True,
+                 cache_inverses: bool = False,
+                 mmap: bool = False,
+                 sparse: Union[bool, str] = False,
+                 low_memory: bool = False,
+                 dtype: str = 'float64',
+                 refine: bool = False,
+                 progress: bool = True):
         """
 
         Args:
@@ -50,6 +62,17 @@ class Figaro(IO):
             year: Year from 2010 to 2020
             kind: industry-by-industry (default) or product-by-product
             refresh: Download the data even if it exists on the hard drive
+            cache: Save the parsed data in a binary cache on the hard drive and load it from there next time
+            cache_inverses: Also save the Leontief and Ghosh inverses in the cache once they are computed
+            mmap: Memory-map the cached data and inverses read-only instead of reading them into memory, so that
+                  processes loading the same data share one copy; implies cache and cache_inverses
+            sparse: Use sparse coefficient matrices and solvers for shocks; True or the solver method 'splu'
+                    (default), 'gmres', 'bicgstab' or 'neumann'
+            low_memory: Build all matrices as views of one float64 array holding the raw data and drop the raw
+                        DataFrame afterwards; df is then None and the memory released is reported in memory_saved
+            dtype: Floating point type of the matrices, 'float64' (default) or 'float32' to halve the memory
+            refine: With dtype float32, refine the solutions of shocks to float64 accuracy
+            progress: Show a progress bar
         """
         assert kind in {'industry-by-industry', 'product-by-product'}
 
@@ -65,25 +88,35 @@ class Figaro(IO):
         self.version = version
         self.year = year
         self.kind = kind
-        self._url = config['figaro'][version]['links'][kind][year]
-        self._file_id = re.search(config['figaro'][version]['regex_id'], self._url).group(0)
-        self._data_file = os.path.join(DATA_FOLDER, self._file_id + '.csv')
+        self._url, self._data_file = data_source(db_name, version, year, kind)
+        self._file_id = os.path.splitext(os.path.basename(self._data_file))[0]
+        self._cache = cache or mmap
+        self._mmap_mode = 'r' if mmap else None
+        self._cache_key = cache_key(db_name, version, year, kind)
         file_exists = os.path.exists(self._data_file)
         download = not file_exists or refresh
-        with tqdm(total=3 if download else 2) as pbar:
+        if download:
+            clear_cache(self._cache_key)
+        self.spans = Spans()
+        with tqdm(total=3 if download else 2, disable=not progress) as pbar, \
+                Stages('load', self.spans, pbar) as stage:
             # Download
             if download:
-                pbar.set_description('Downloading data...')
+                stage('download', 'Downloading data...')
                 self._download_data()
                 pbar.update()
 
             # Load
-            pbar.set_description('Loading data...')
-            self.df = self._load_data()
+            stage('parse', 'Loading data...')
+            if low_memory:
+                # The lru cache of _load_data would keep the DataFrame alive, so it is bypassed
+                self.df = single_block(self._load_data.__wrapped__(self))
+            else:
+                self.df = self._load_data()
             pbar.update()
 
             # Create matrices
-            pbar.set_description('Creating matrices...')
+            stage('matrices', 'Creating matrices...')
             self.rs = config['figaro'][version]['num_regions'] * config['figaro'][version]['num_sectors']
             self.Z = Matrix('Intermediate use',
                             *process_df(self.df.iloc[:self.rs, :self.rs]))
@@ -112,6 +145,7 @@ class Figaro(IO):
             self.ADD = {'GVA_GRAN': GVA_GRAN}
 
             # Create region level FD
+            stage('fd_region')
             fd_region = pd.DataFrame(self.FD_GRAN, columns=[r for r, s in self.FD_GRAN.columns]).T
             fd_region.index.name = 'region'
             fd_region = fd_region.groupby('region').sum(0).T
@@ -128,26 +162,40 @@ class Figaro(IO):
             self.reference = 'https://ec.europa.eu/eurostat/web/products-statistical-working-papers/-/KS-TC-19-002'
             self.contact = 'estat-iga@ec.europa.eu'
 
-            super().__init__()
+            stage('init')
+            super().__init__(cache_key=self._cache_key if self._cache and (cache_inverses or mmap) else None,
+                             mmap=mmap,
+                             sparse=sparse,
+                             dtype=dtype,
+                             refine=refine)
+
+            if low_memory:
+                self.memory_saved = frame_memory(self.df, shared=self.Z)
+                self.df = None
 
             pbar.update()
-            pbar.set_description('Done')
+            pbar.set_description(f'Done, {self.memory_saved / 1e6:.1f} MB released' if low_memory else 'Done')
 
     @lru_cache()
     def _load_data(self):
-        df = pd.read_csv(self._data_file, index_col=0)
+        if self._cache:
+            df = load_frame(self._cache_key, 'data', source=self._data_file, mmap_mode=self._mmap_mode)
+            if df is not None:
+                return df
+
+        with span('read_csv'):
+            df = pd.read_csv(self._data_file, index_col=0)
+
+        if self._cache:
+            clear_cache(self._cache_key)
+            save_frame(self._cache_key, 'data', df, source=self._data_file)
+            if self._mmap_mode:
+                df = load_frame(self._cache_key, 'data', mmap_mode=self._mmap_mode)
         return df
 
     def _download_data(self):
-        import requests
-
         try:
-            r = requests.get(self._url, stream=True)
-            with open(self._data_file, "wb") as f:
-                for chunk in r.iter_content(1024 * 5):
-                    f.write(chunk)
-            with open(FILES_LOG, 'a') as files_log:
-                files_log.write(db_name + ';' + self._data_file + '\n')
+            download(self._url, self._data_file, db_name)
         except Exception as e:
             warn(f"Couldn't download the data. Try downloading manually from {self._url} "
                  f"and save the csv file as {self._file_id}.csv in {DATA_FOLDER}")
@@ -8,3 +8,4 @@ import os
 DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.temp_data')
 IS_WINDOWS = os.name == 'nt'
 FILES_LOG = os.path.join(DATA_FOLDER, '_files_log.txt')
+CACHE_FOLDER = os.path.join(DATA_FOLDER, '_cache')
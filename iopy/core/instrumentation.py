@@ -0,0 +1,241 @@
+"""  Created on 17/10/2026::
+------------- instrumentation -------------
+**Authors**: W. Wakker
+
+Named spans with wall time, CPU time and optionally the peak of allocated memory, recorded for the stages of the
+loaders and for model calls. Spans are kept on the instance they belong to (e.g. oecd.spans) and passed to hooks, e.g.
+to send them to a metrics system. Measuring memory uses tracemalloc, which slows down allocations, and is therefore
+switched off by default, see configure.
+
+"""
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Optional
+from warnings import warn
+import threading
+import tracemalloc
+import json
+import time
+
+MAX_SPANS = 10000
+
+_settings = {'memory': False}
+_hooks = []
+_local = threading.local()
+
+
+class Spans(deque):
+    """Recorded spans, the oldest spans are dropped after MAX_SPANS"""
+
+    def __init__(self, spans=(), maxlen=MAX_SPANS):
+        super().__init__(spans, maxlen=maxlen)
+
+    def summary(self):
+        """Totals per span path
+
+        Returns:
+            dict: Path to number of calls, wall and CPU seconds and the largest peak of allocated bytes
+        """
+        totals = {}
+        for span in self:
+            total = totals.setdefault(span['path'], {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'peak_bytes': None})
+            total['calls'] += 1
+            total['wall'] += span['wall']
+            total['cpu'] += span['cpu']
+            if span['peak_bytes'] is not None:
+                total['peak_bytes'] = max(total['peak_bytes'] or 0, span['peak_bytes'])
+        return totals
+
+    def to_dict(self):
+        """Spans and their summary
+
+        Returns:
+            dict: spans (list of dicts with name, path, start, wall, cpu, peak_bytes and attributes) and summary
+        """
+        return {'spans': list(self), 'summary': self.summary()}
+
+    def to_json(self, path: Optional[str] = None):
+        """Spans and their summary as JSON, see to_dict
+
+        Args:
+            path: File to write the JSON to, returned as a string if None
+
+        Returns:
+            str: JSON, or None if written to path
+        """
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path is None:
+            return text
+        with open(path, 'w') as f:
+            f.write(text)
+
+
+def configure(memory: Optional[bool] = None):
+    """Change the settings of the instrumentation
+
+    Args:
+        memory: Measure the peak of allocated bytes of every span with tracemalloc, which slows down allocations;
+                before Python 3.9 the peak of a span is an upper bound that can include the peaks of earlier spans
+    """
+    if memory is not None:
+        _settings['memory'] = memory
+
+
+def add_hook(hook: Callable[[dict], None]):
+    """Call a function with every recorded span, e.g. to send it to a metrics system
+
+    Args:
+        hook: Function that takes the span as a dict, see Spans.to_dict
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[dict], None]):
+    """Stop calling a function added with add_hook
+
+    Args:
+        hook: Function
+    """
+    _hooks.remove(hook)
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def span(name: str,
+         spans: Optional[Spans] = None,
+         **attributes):
+    """Record a span. Spans opened within a span are recorded in the same Spans, with the names of the enclosing spans
+    in their path, e.g. load/parse.
+
+    Args:
+        name: Name of the span
+        spans: Spans to record in, those of the enclosing span (or none) if None
+        **attributes: Any additional json serializable information, e.g. the number of scenarios
+    """
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    if spans is None:
+        spans = parent['spans'] if parent is not None else None
+
+    memory = _settings['memory']
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None and parent['memory'] is not None:
+            # The peak is reset for this span, keep the peak so far for the enclosing span
+            parent['peak'] = max(parent['peak'], peak)
+        # Python < 3.9 cannot reset the peak, the peak of the span then includes earlier peaks since tracing started
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+    frame = {'name': name, 'spans': spans, 'memory': current if memory else None, 'peak': 0}
+    stack.append(frame)
+
+    start = time.time()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        stack.pop()
+        peak_bytes = None
+        if memory and tracemalloc.is_tracing():
+            peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(peak - frame['memory'], 0)
+            if parent is not None and parent['memory'] is not None:
+                parent['peak'] = max(parent['peak'], peak)
+        if started_tracing:
+            tracemalloc.stop()
+
+        path = '/'.join([s['name'] for s in stack] + [name])
+        record = {'name': name, 'path': path, 'start': start, 'wall': wall, 'cpu': cpu, 'peak_bytes': peak_bytes,
+                  'attributes': attributes}
+        if spans is not None:
+            spans.append(record)
+        for hook in list(_hooks):
+            try:
+                hook(record)
+            except Exception as e:
+                warn(f'Instrumentation hook {hook} failed: {e}')
+
+
+class Stages:
+    """Consecutive spans within an enclosing span, e.g. the stages of a loader. Calling the instance ends the current
+    stage and starts the next one, and updates the description of a progress bar if given.
+    """
+
+    def __init__(self,
+                 name: str,
+                 spans: Spans,
+                 pbar=None):
+        """
+
+        Args:
+            name: Name of the enclosing span
+            spans: Spans to record in
+            pbar: tqdm progress bar
+        """
+        self._outer = span(name, spans=spans)
+        self._stage = None
+        self._pbar = pbar
+
+    def __enter__(self):
+        self._outer.__enter__()
+        return self
+
+    def __call__(self, name: str, description: Optional[str] = None):
+        self._end(None, None, None)
+        if description is not None and self._pbar is not None:
+            self._pbar.set_description(description)
+        self._stage = span(name)
+        self._stage.__enter__()
+
+    def _end(self, *exc_info):
+        if self._stage is not None:
+            stage, self._stage = self._stage, None
+            stage.__exit__(*exc_info)
+
+    def __exit__(self, *exc_info):
+        self._end(*exc_info)
+        return self._outer.__exit__(*exc_info)
+
+
+def traced(name: str):
+    """Decorator that records a span for every call of a function, in the spans of the enclosing span
+
+    Args:
+        name: Name of the span
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrumented(name: str):
+    """Decorator that records a span for every call of a method, in the spans of the instance
+
+    Args:
+        name: Name of the span
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if getattr(self, 'spans', None) is None:
+                self.spans = Spans()
+            with span(name, spans=self.spans):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -3,12 +3,92 @@
 **Authors**: W. Wakker
 
 """
+from typing import Iterable, Optional
+from scipy import sparse
 import numpy as np
+import pandas as pd
+
+
+class LabelIndex:
+    """Integer region and sector codes for a list of (region, sector) labels, or of plain region labels, to
+    find the positions of regions and sectors with vectorized lookups instead of looping over the labels.
+    """
+
+    def __init__(self, labels: list):
+        """
+
+        Args:
+            labels: List of (region, sector) tuples or list of regions
+        """
+        self.labels = labels
+        if len(labels) and isinstance(labels[0], tuple):
+            self.region_codes, self.regions = pd.factorize(pd.Index([r for r, s in labels]))
+            self.sector_codes, self.sectors = pd.factorize(pd.Index([s for r, s in labels]))
+        else:
+            self.region_codes, self.regions = pd.factorize(pd.Index(labels))
+            self.sector_codes, self.sectors = None, None
+
+    @staticmethod
+    def _isin(codes, uniques, values):
+        if isinstance(values, str):
+            values = [values]
+        return np.isin(codes, uniques.get_indexer(pd.Index(values).unique()))
+
+    def mask(self,
+             regions: Optional[Iterable] = None,
+             sectors: Optional[Iterable] = None):
+        """Boolean mask of the labels in regions and sectors; labels that do not exist are ignored
+
+        Args:
+            regions: List of regions, all regions if None
+            sectors: List of sectors, all sectors if None
+
+        Returns:
+            np.ndarray: Boolean mask
+        """
+        mask = np.ones(len(self.labels), dtype=bool)
+        if regions is not None:
+            mask &= self._isin(self.region_codes, self.regions, regions)
+        if sectors is not None:
+            assert self.sector_codes is not None, "Labels do not contain sectors"
+            mask &= self._isin(self.sector_codes, self.sectors, sectors)
+        return mask
+
+    def positions(self,
+                  regions: Optional[Iterable] = None,
+                  sectors: Optional[Iterable] = None):
+        """Positions of the labels in regions and sectors
+
+        Args:
+            regions: List of regions, all regions if None
+            sectors: List of sectors, all sectors if None
+
+        Returns:
+            np.ndarray: Integer positions
+        """
+        return np.flatnonzero(self.mask(regions=regions, sectors=sectors))
+
+    def aggregator(self, level: str = 'region'):
+        """Sparse 0/1 matrix S of shape (number of regions or sectors, number of labels), such that S @ M sums the
+        rows of M by region or sector
+
+        Args:
+            level: region or sector
+
+        Returns:
+            scipy.sparse.csr_matrix
+        """
+        assert level in {'region', 'sector'}, "level must be 'region' or 'sector'"
+        codes, uniques = (self.region_codes, self.regions) if level == 'region' else (self.sector_codes, self.sectors)
+        assert codes is not None, "Labels do not contain sectors"
+        return sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))),
+                                 shape=(len(uniques), len(codes)))
 
 
 class Matrix(np.ndarray):
 
     def __new__(cls, info, input_array, rows, columns):
+        # asarray does not copy ndarrays, so a Matrix created from a (slice of a) np.memmap keeps sharing its pages
         obj = np.asarray(input_array).view(cls)
         assert len(obj.shape) == 2, "Array must be 2-dimensional"
         assert obj.shape == (len(rows), len(columns)), "Rows and columns do not have the shape of the array"
@@ -21,6 +101,39 @@ class Matrix(np.ndarray):
         self.info = getattr(obj, 'info', None)
         self.rows = getattr(obj, 'rows', None)
         self.columns = getattr(obj, 'columns', None)
+        self._row_index = getattr(obj, '_row_index', None)
+        self._col_index = getattr(obj, '_col_index', None)
+
+    def __reduce__(self):
+        # Keep info, rows and columns when pickling, e.g. to send a Matrix to another process
+        reconstruct, args, state = super().__reduce__()
+        return reconstruct, args, (state, self.info, self.rows, self.columns)
+
+    def __setstate__(self, state):
+        state, self.info, self.rows, self.columns = state
+        super().__setstate__(state)
+
+    @property
+    def row_index(self):
+        """LabelIndex of the rows, created on first access
+
+        Returns:
+            LabelIndex
+        """
+        if getattr(self, '_row_index', None) is None or self._row_index.labels is not self.rows:
+            self._row_index = LabelIndex(self.rows)
+        return self._row_index
+
+    @property
+    def col_index(self):
+        """LabelIndex of the columns, created on first access
+
+        Returns:
+            LabelIndex
+        """
+        if getattr(self, '_col_index', None) is None or self._col_index.labels is not self.columns:
+            self._col_index = LabelIndex(self.columns)
+        return self._col_index
 
     @property
     def I(self):
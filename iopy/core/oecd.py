@@ -8,34 +8,150 @@ from iopy.core.matrix import Matrix
 from functools import lru_cache
 import numpy as np
 import pandas as pd
+from typing import Union
 from iopy.core.utils import ALPHA3_TO_ALPHA2
 from tqdm import tqdm
-from zipfile import ZipFile
-import re
+import csv
 import os
 from iopy.core.config import config
 from iopy.core.base_io import IO
-from iopy.core.utils import replace_if_exists, remove_downloaded_files
-from iopy.core.globals import DATA_FOLDER, FILES_LOG
+from iopy.core.instrumentation import Spans, Stages, traced
+from iopy.core.utils import replace_if_exists, remove_downloaded_files, single_block, frame_memory
+from iopy.core.globals import DATA_FOLDER
+from iopy.core.download import data_source, download
+from iopy.core.cache import cache_key, load_frame, save_frame, is_cached, clear as clear_cache
+from iopy.core.archives import get_archive, close_archive, hold_archive, read_members
+from typing import Iterable, Optional
 from warnings import warn
 from functools import partial
 
 db_name = os.path.basename(__file__).rstrip('.py')
 
 
+def split_labels(labels):
+    """Split region_sector labels into (region, sector) tuples in one vectorized pass, with alpha-3 region codes
+    replaced by alpha-2 codes
+
+    Args:
+        labels: Labels of the form region_sector
+
+    Returns:
+        list: (region, sector) tuples
+    """
+    parts = np.char.partition(np.asarray(labels, dtype=str), '_')
+    region_codes, regions = pd.factorize(parts[:, 0])
+    regions = np.array([ALPHA3_TO_ALPHA2.get(r, str(r)) for r in regions], dtype=object)
+    return list(zip(regions[region_codes], parts[:, 2].tolist()))
+
+
+@traced('labels')
 def process_df(df):
     if df.shape[0] > 1 and df.shape[1] > 1:
-        return (df,
-                [(ALPHA3_TO_ALPHA2[r] if r in ALPHA3_TO_ALPHA2 else r, s) for r, s in df.index.str.split('_')],
-                [(ALPHA3_TO_ALPHA2[r] if r in ALPHA3_TO_ALPHA2 else r, s) for r, s in df.columns.str.split('_')])
+        return df, split_labels(df.index), split_labels(df.columns)
     elif df.shape[0] == 1:
-        return (df,
-                df.index.to_list(),
-                [(ALPHA3_TO_ALPHA2[r] if r in ALPHA3_TO_ALPHA2 else r, s) for r, s in df.columns.str.split('_')])
+        return df, df.index.to_list(), split_labels(df.columns)
     else:
-        return (df,
-                [(ALPHA3_TO_ALPHA2[r] if r in ALPHA3_TO_ALPHA2 else r, s) for r, s in df.index.str.split('_')],
-                df.columns.to_list())
+        return df, split_labels(df.index), df.columns.to_list()
+
+
+def data_file(version: str, year: int):
+    """Path of the downloaded zip file containing a year
+
+    Args:
+        version: Publication version of the data
+        year: Year
+
+    Returns:
+        str: Path
+    """
+    return data_source(db_name, version, year)[1]
+
+
+def csv_filename(version: str, year: int):
+    """Name of the csv file of a year in the downloaded zip file
+
+    Args:
+        version: Publication version of the data
+        year: Year
+
+    Returns:
+        str: File name
+    """
+    return {'2021': f'ICIO2021_{year}.csv',
+            '2022-extended': f'{year}.CSV',
+            '2022-small': f'{year}SML.CSV'}[version]
+
+
+@traced('read_csv')
+def read_icio_csv(csv_file):
+    """Read an ICIO csv file. The header is parsed once and, if pyarrow is installed, the numeric body is parsed by
+    the multithreaded pyarrow csv reader straight into one preallocated float64 array. Otherwise the pandas C parser is
+    used.
+
+    Args:
+        csv_file: Path or binary file object, e.g. opened from the zip file
+
+    Returns:
+        pd.DataFrame: Data with the row labels as index and the column labels as columns
+    """
+    if isinstance(csv_file, (str, os.PathLike)):
+        with open(csv_file, 'rb') as f:
+            return read_icio_csv(f)
+
+    header = next(csv.reader([csv_file.readline().decode('utf-8-sig')]))
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        df = pd.read_csv(csv_file, header=None, index_col=0, engine='c').astype(np.float64, copy=False)
+    else:
+        names = [str(i) for i in range(len(header))]
+        table = pa_csv.read_csv(csv_file,
+                                read_options=pa_csv.ReadOptions(column_names=names, block_size=1 << 26),
+                                convert_options=pa_csv.ConvertOptions(
+                                    column_types={**{name: pa.float64() for name in names[1:]}, names[0]: pa.string()}))
+        # Filled column by column in the column-major layout pandas stores a single float block in, so no copy is made
+        data = np.empty((table.num_columns - 1, table.num_rows))
+        for j, column in enumerate(table.columns[1:]):
+            data[j] = column.to_numpy()
+        df = pd.DataFrame(data.T, index=pd.Index(table.column(0).to_pylist(), dtype=object))
+    df.index.name = header[0] or None
+    df.columns = pd.Index(header[1:])
+    return df
+
+
+def extract_years(version: str,
+                  years: Optional[Iterable[int]] = None,
+                  max_workers: Optional[int] = None):
+    """Decompress and parse all years of downloaded zip files in one sweep, in parallel, and save them in the binary
+    cache, so that loading these years skips parsing. Several years are stored in the same zip file, which is opened
+    only once. Years that are already cached or whose zip file is not downloaded yet are skipped.
+
+    Args:
+        version: Publication version of the data; '2021', '2022-small' or '2022-extended'
+        years: Years to extract, all years of the version by default
+        max_workers: Maximum number of threads
+
+    Returns:
+        list: Years that were extracted
+    """
+    years = config['oecd'][version]['links'].keys() if years is None else years
+    archives = {}
+    for year in years:
+        path = data_file(version, year)
+        if os.path.exists(path) and not is_cached(cache_key(db_name, version, year), 'data', source=path):
+            archives.setdefault(path, []).append(year)
+
+    extracted = []
+    for path, archive_years in archives.items():
+        dfs = read_members(path, [csv_filename(version, year) for year in archive_years], read_icio_csv,
+                           max_workers=max_workers)
+        for year in archive_years:
+            key = cache_key(db_name, version, year)
+            clear_cache(key)
+            save_frame(key, 'data', dfs[csv_filename(version, year)], source=path)
+            extracted.append(year)
+    return extracted
 
 
 class OECD(IO):
@@ -44,13 +160,32 @@ class OECD(IO):
     def __init__(self,
                  version: str,
                  year: int,
-                 refresh: bool = False):
+                 refresh: bool = False,
+                 cache: bool = True,
+                 cache_inverses: bool = False,
+                 mmap: bool = False,
+                 sparse: Union[bool, str] = False,
+                 low_memory: bool = False,
+                 dtype: str = 'float64',
+                 refine: bool = False,
+                 progress: bool = True):
         """
 
         Args:
             version: Publication version of the data; '2021', '2022-small' or '2022-extended'
             year: Year
             refresh: Download the data even if it exists on the hard drive
+            cache: Save the parsed data in a binary cache on the hard drive and load it from there next time
+            cache_inverses: Also save the Leontief and Ghosh inverses in the cache once they are computed
+            mmap: Memory-map the cached data and inverses read-only instead of reading them into memory, so that
+                  processes loading the same data share one copy; implies cache and cache_inverses
+            sparse: Use sparse coefficient matrices and solvers for shocks; True or the solver method 'splu'
+                    (default), 'gmres', 'bicgstab' or 'neumann'
+            low_memory: Build all matrices as views of one float64 array holding the raw data and drop the raw
+                        DataFrame afterwards; df is then None and the memory released is reported in memory_saved
+            dtype: Floating point type of the matrices, 'float64' (default) or 'float32' to halve the memory
+            refine: With dtype float32, refine the solutions of shocks to float64 accuracy
+            progress: Show a progress bar
         """
 
         if version not in config['oecd'].keys():
@@ -64,21 +199,34 @@ class OECD(IO):
 
         self.year = year
         self.version = version
-        self._url = config['oecd'][version]['links'][year]
-        self._file_id = re.search(config['oecd'][version]['regex_id'], self._url).group(0)
-        self._data_file = os.path.join(DATA_FOLDER, self._file_id + '.zip')
+        self._url, self._data_file = data_source(db_name, version, year)
+        self._file_id = os.path.splitext(os.path.basename(self._data_file))[0]
+        self._cache = cache or mmap
+        self._mmap_mode = 'r' if mmap else None
+        self._cache_key = cache_key(db_name, version, year)
         file_exists = os.path.exists(self._data_file)
         download = not file_exists or refresh
-        with tqdm(total=3 if download else 2) as pbar:
+        if download:
+            close_archive(self._data_file)
+            clear_cache(self._cache_key)
+        # The shared archive is closed once no instance uses it anymore
+        hold_archive(self._data_file, self)
+        self.spans = Spans()
+        with tqdm(total=3 if download else 2, disable=not progress) as pbar, \
+                Stages('load', self.spans, pbar) as stage:
             # Download
             if download:
-                pbar.set_description('Downloading data...')
+                stage('download', 'Downloading data...')
                 self._download_data()
                 pbar.update()
 
             # Load
-            pbar.set_description('Loading data...')
-            self.df = self._load_data()
+            stage('parse', 'Loading data...')
+            if low_memory:
+                # The lru cache of _load_data would keep the DataFrame alive, so it is bypassed
+                self.df = single_block(self._load_data.__wrapped__(self))
+            else:
+                self.df = self._load_data()
             pbar.update()
 
             if version in ['2022-small', '2022-extended']:
@@ -88,7 +236,7 @@ class OECD(IO):
                     partial(replace_if_exists, mapping=oecd_sector_2022_2021_mapping))
 
             # Create matrices
-            pbar.set_description('Creating matrices...')
+            stage('matrices', 'Creating matrices...')
             self.rs = config['oecd'][version]['num_regions'] * config['oecd'][version]['num_sectors']
             self.Z = Matrix('Intermediate use',
                             *process_df(self.df.iloc[:self.rs, :self.rs]))
@@ -99,16 +247,16 @@ class OECD(IO):
                              rows=self.Z.rows,
                              columns=['FD'])
             self.X = Matrix('Output',
-                            self.df.iloc[:self.rs, [-1]],
+                            self.df.iloc[:self.rs, -1:],
                             rows=self.Z.rows,
                             columns=['X'])
             self.V = Matrix('GVA',
                             (self.X.flatten() - self.Z.sum(0).flatten()).reshape(1, len(self.X)),
                             rows=['GVA'],
                             columns=self.Z.columns)
+            va = self.df.index.get_loc('VALU' if version == '2021' else 'VA')
             VA = Matrix('Value added at basic prices (net)',
-                        *process_df(
-                            self.df.iloc[[self.df.index.get_loc('VALU' if version == '2021' else 'VA')], :self.rs]))
+                        *process_df(self.df.iloc[va:va + 1, :self.rs]))
 
             TLS = Matrix('Taxes less subsidies on intermediate and final products',
                          *process_df(self.df.iloc[self.rs:-2, :-1]))
@@ -117,6 +265,7 @@ class OECD(IO):
                         'TLS': TLS}
 
             # Create region level FD
+            stage('fd_region')
             fd_region = pd.DataFrame(self.FD_GRAN, columns=[r for r, s in self.FD_GRAN.columns]).T
             fd_region.index.name = 'region'
             fd_region = fd_region.groupby('region').sum(0).T
@@ -133,34 +282,40 @@ class OECD(IO):
             self.reference = f'OECD ({self.version[:4]}), OECD Inter-Country Input-Output Database, http://oe.cd/icio'
             self.contact = 'ICIO-TiVA.Contact@oecd.org, mentioning ICIO'
 
-            super().__init__()
+            stage('init')
+            super().__init__(cache_key=self._cache_key if self._cache and (cache_inverses or mmap) else None,
+                             mmap=mmap,
+                             sparse=sparse,
+                             dtype=dtype,
+                             refine=refine)
+
+            if low_memory:
+                self.memory_saved = frame_memory(self.df, shared=self.Z)
+                self.df = None
 
             pbar.update()
-            pbar.set_description('Done')
+            pbar.set_description(f'Done, {self.memory_saved / 1e6:.1f} MB released' if low_memory else 'Done')
 
     @lru_cache()
     def _load_data(self):
-        if self.version == '2021':
-            filename = f'ICIO2021_{self.year}.csv'
-        elif self.version == '2022-extended':
-            filename = f'{self.year}.CSV'
-        elif self.version == '2022-small':
-            filename = f'{self.year}SML.CSV'
-        with ZipFile(self._data_file, 'r') as zf:
-            with zf.open(filename, 'r') as csv_file:
-                df = pd.read_csv(csv_file, index_col=0)
+        if self._cache:
+            df = load_frame(self._cache_key, 'data', source=self._data_file, mmap_mode=self._mmap_mode)
+            if df is not None:
+                return df
+
+        with get_archive(self._data_file).open(csv_filename(self.version, self.year), 'r') as csv_file:
+            df = read_icio_csv(csv_file)
+
+        if self._cache:
+            clear_cache(self._cache_key)
+            save_frame(self._cache_key, 'data', df, source=self._data_file)
+            if self._mmap_mode:
+                df = load_frame(self._cache_key, 'data', mmap_mode=self._mmap_mode)
         return df
 
     def _download_data(self):
-        import requests
-
         try:
-            r = requests.get(self._url, stream=True)
-            with open(self._data_file, "wb") as f:
-                for chunk in r.iter_content(1024 * 5):
-                    f.write(chunk)
-            with open(FILES_LOG, 'a') as files_log:
-                files_log.write(db_name + ';' + self._data_file + '\n')
+            download(self._url, self._data_file, db_name)
         except Exception as e:
             warn(f"Couldn't download the data. Try downloading manually from {self._url} "
                  f"and save the zip file as {self._file_id}.zip in {DATA_FOLDER}")
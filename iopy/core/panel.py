@@ -0,0 +1,137 @@
+"""  Created on 17/10/2026::
+------------- panel -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.config import config
+from iopy.core.oecd import OECD, extract_years
+from iopy.core.figaro import Figaro
+from iopy.core.exiobase import ExioBase
+from iopy.core.download import prefetch
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+import numpy as np
+
+LOADERS = {'oecd': OECD,
+           'figaro': Figaro,
+           'exiobase': ExioBase}
+
+MATRICES = ['Z', 'FD', 'FD_REGION', 'X', 'V']
+
+
+def _load_years(database: str,
+                version: str,
+                years: list,
+                inverses: bool,
+                kwargs: dict):
+    """Load several years of a database in one process, meant to be run in a worker process
+
+    Args:
+        database: oecd, figaro or exiobase
+        version: Version of the data
+        years: Years that are stored in the same downloaded file
+        inverses: Also compute the Leontief and Ghosh inverses
+        kwargs: Keyword arguments passed to the loader
+
+    Returns:
+        list: (year, dict of matrices, dict of attributes) per year
+    """
+    if database == 'oecd' and len(years) > 1 and kwargs.get('cache', True) and not kwargs.get('refresh', False):
+        # Parse all years of the zip file in one sweep into the cache, the loaders below then skip parsing
+        extract_years(version, years)
+
+    results = []
+    for year in years:
+        io = LOADERS[database](version=version, year=year, **kwargs)
+        matrices = {name: getattr(io, name) for name in MATRICES + (['L', 'G'] if inverses else [])}
+        attributes = {name: getattr(io, name) for name in ['regions', 'sectors', 'unit', 'sector_name_mapping',
+                                                           'demand_items']}
+        results.append((year, matrices, attributes))
+        # The lru cache of _load_data would keep every instance alive with its dataframe
+        del io
+        LOADERS[database]._load_data.cache_clear()
+    return results
+
+
+class Panel:
+    """Class to load a range of years of one database version into arrays stacked by year (year x rows x columns)
+    with shared labels. Years are loaded in parallel processes, where years that are stored in the same downloaded
+    file are loaded by the same process.
+    """
+
+    def __init__(self,
+                 database: str,
+                 version: str,
+                 years: Iterable[int],
+                 kind: Optional[str] = None,
+                 inverses: bool = False,
+                 max_workers: Optional[int] = None,
+                 **kwargs):
+        """
+
+        Args:
+            database: oecd, figaro or exiobase
+            version: Version of the data, see the loaders
+            years: Years to load
+            kind: industry-by-industry or product-by-product for figaro and exiobase
+            inverses: Also compute the Leontief and Ghosh inverses L and G
+            max_workers: Maximum number of worker processes, the number of processors by default; 1 loads all years in
+                         the current process
+            **kwargs: Other keyword arguments passed to the loader, e.g. refresh or cache; the progress bars of the
+                      loaders are off unless progress=True
+        """
+        if database not in LOADERS:
+            raise ValueError(f'Database not recognized. \n Please choose among {list(LOADERS)}')
+
+        self.database = database
+        self.version = version
+        self.kind = kind
+        self.years = sorted(years)
+        # Progress bars of parallel workers would garble each other
+        kwargs.setdefault('progress', False)
+        if kind is not None:
+            kwargs['kind'] = kind
+            links = config[database][version]['links'][kind]
+        else:
+            links = config[database][version]['links']
+        assert set(self.years).issubset(links), f'Years not found: {set(self.years).difference(links)}'
+
+        # One task per downloaded file, so that a file is downloaded and opened by one process only
+        groups = {}
+        for year in self.years:
+            groups.setdefault(links[year], []).append(year)
+        tasks = [(database, version, group, inverses, kwargs) for group in groups.values()]
+        if not kwargs.get('refresh', False):
+            # Download missing files concurrently up front instead of one per worker process
+            prefetch([(database, version, group[0], kind) for group in groups.values()])
+
+        if max_workers == 1:
+            results = [result for task in tasks for result in _load_years(*task)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_load_years, *task) for task in tasks]
+                results = [result for future in futures for result in future.result()]
+        results = dict((year, (matrices, attributes)) for year, matrices, attributes in results)
+
+        first, attributes = results[self.years[0]]
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        for name, matrix in first.items():
+            assert all(results[year][0][name].rows == matrix.rows and results[year][0][name].columns == matrix.columns
+                       for year in self.years), f'Labels of {name} differ between years'
+            setattr(self, name, np.stack([np.asarray(results[year][0][name]) for year in self.years]))
+        self.rows = first['Z'].rows
+        self.columns = first['Z'].columns
+        self.fd_region_columns = first['FD_REGION'].columns
+        self.rs = len(self.rows)
+
+    def year_index(self, year: int):
+        """Position of a year in the first axis of the stacked arrays
+
+        Args:
+            year: Year
+
+        Returns:
+            int: Position
+        """
+        return self.years.index(year)
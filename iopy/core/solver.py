@@ -0,0 +1,238 @@
+"""  Created on 17/10/2026::
+------------- solver -------------
+**Authors**: W. Wakker
+
+"""
+from scipy.linalg import lu_factor, lu_solve
+from scipy import sparse
+from scipy.sparse.linalg import splu, gmres, bicgstab
+from warnings import warn
+import numpy as np
+import inspect
+
+# The relative tolerance of the Krylov methods is called rtol from scipy 1.12 and tol before
+_TOL = 'rtol' if 'rtol' in inspect.signature(gmres).parameters else 'tol'
+
+
+class LUSolver:
+    """Solves (I - M)x = b for a square coefficients matrix M, using a single LU factorization of (I - M).
+
+    For the Leontief model M is A and solving gives Lb, for the Ghosh model M is B and the transposed solve gives G'b.
+    A float32 M is factorized in float32, at half the memory and about twice the speed of float64. Solutions can then be
+    refined iteratively with residuals computed in float64, which recovers the accuracy of a float64 solve.
+    """
+
+    def __init__(self,
+                 M,
+                 refine: bool = False,
+                 tol: float = 1e-12,
+                 maxiter: int = 10,
+                 block_size: int = 1024):
+        """
+
+        Args:
+            M: Square coefficients matrix, e.g. A or B
+            refine: Refine solutions with float64 residuals, only useful if M is float32
+            tol: Relative residual at which the refinement stops
+            maxiter: Maximum number of refinement steps
+            block_size: Number of rows of M that are converted to float64 at once to compute the residuals
+        """
+        assert M.ndim == 2 and M.shape[0] == M.shape[1], "Matrix must be square"
+        M = np.asarray(M)
+        self.n = M.shape[0]
+        self.dtype = np.dtype('float32') if M.dtype == np.float32 else np.dtype('float64')
+        self.tol = tol
+        self.maxiter = maxiter
+        self.block_size = block_size
+        self._M = M if refine else None
+        self._lu = lu_factor(np.eye(self.n, dtype=self.dtype) - M, overwrite_a=True, check_finite=False)
+
+    def _lu_solve(self, b, trans: bool):
+        return lu_solve(self._lu, np.asarray(b, dtype=self.dtype), trans=1 if trans else 0, check_finite=False)
+
+    def _product(self, x, trans: bool):
+        # M @ x or M' @ x in float64, converting M block by block instead of as a whole
+        M = self._M.T if trans else self._M
+        y = np.empty(x.shape)
+        for i in range(0, self.n, self.block_size):
+            y[i:i + self.block_size] = M[i:i + self.block_size].astype('float64') @ x
+        return y
+
+    def _refine(self, b, x, trans: bool):
+        b = np.asarray(b, dtype='float64')
+        x = x.astype('float64')
+        norm_b = np.linalg.norm(b)
+        for _ in range(self.maxiter):
+            r = b - x + self._product(x, trans)
+            norm_r = np.linalg.norm(r)
+            if norm_r <= self.tol * norm_b:
+                return x
+            # Scaled so that the small residual is not rounded away in the low precision solve
+            x += self._lu_solve(r / norm_r, trans) * norm_r
+        warn(f'Iterative refinement did not converge within {self.maxiter} steps')
+        return x
+
+    def solve(self, b, trans: bool = False):
+        """Solve (I - M)x = b, or (I - M)'x = b if trans is true
+
+        Args:
+            b: Right hand side of shape (n,) or (n, k), multiple columns are solved at once
+            trans: Solve the transposed system
+
+        Returns:
+            np.ndarray: x with the same shape as b, float64 if refined and otherwise in the dtype of the solver
+        """
+        x = self._lu_solve(b, trans)
+        if self._M is not None:
+            x = self._refine(b, x, trans)
+        return x
+
+    def inverse(self):
+        """Explicit inverse (I - M)^-1 from the factorization, in the dtype of the solver and without refinement
+
+        Returns:
+            np.ndarray: Inverse
+        """
+        return self._lu_solve(np.eye(self.n, dtype=self.dtype), trans=False)
+
+
+class SparseSolver:
+    """Solves (I - M)x = b for a sparse coefficients matrix M without building any dense n x n matrix.
+
+    Supported methods are a sparse direct LU factorization ('splu'), the iterative Krylov methods 'gmres' and
+    'bicgstab', and the power series x = b + Mb + M^2b + ... ('neumann'), which converges since the column sums of
+    A (or row sums of B) are below 1.
+    """
+    methods = ('splu', 'gmres', 'bicgstab', 'neumann')
+
+    def __init__(self,
+                 M,
+                 method: str = 'splu',
+                 tol: float = 1e-10,
+                 maxiter: int = 1000):
+        """
+
+        Args:
+            M: Square coefficients matrix, e.g. A or B, dense or scipy.sparse
+            method: splu, gmres, bicgstab or neumann
+            tol: Relative tolerance of the iterative methods
+            maxiter: Maximum number of iterations of the iterative methods
+        """
+        assert M.ndim == 2 and M.shape[0] == M.shape[1], "Matrix must be square"
+        if method not in self.methods:
+            raise ValueError(f'method must be one of {self.methods}')
+        self.n = M.shape[0]
+        self.method = method
+        self.tol = tol
+        self.maxiter = maxiter
+        self._M = sparse.csr_matrix(M)
+        self._I_M = (sparse.identity(self.n, format='csr') - self._M).tocsc()
+        if method == 'splu':
+            self._lu = splu(self._I_M)
+
+    def _neumann(self, M, b):
+        x = b.copy()
+        term = b
+        for _ in range(self.maxiter):
+            term = M @ term
+            x += term
+            if np.linalg.norm(term) <= self.tol * np.linalg.norm(x):
+                return x
+        warn(f'Neumann series did not converge within {self.maxiter} iterations')
+        return x
+
+    def _krylov(self, op, b):
+        x = np.empty_like(b)
+        method = gmres if self.method == 'gmres' else bicgstab
+        for j in range(b.shape[1]):
+            x[:, j], info = method(op, b[:, j], atol=0, maxiter=self.maxiter, **{_TOL: self.tol})
+            if info > 0:
+                warn(f'{self.method} did not converge within {self.maxiter} iterations')
+        return x
+
+    def solve(self, b, trans: bool = False):
+        """Solve (I - M)x = b, or (I - M)'x = b if trans is true
+
+        Args:
+            b: Right hand side of shape (n,) or (n, k), multiple columns are solved at once
+            trans: Solve the transposed system
+
+        Returns:
+            np.ndarray: x with the same shape as b
+        """
+        b = np.asarray(b, dtype='float64')
+        rhs = b.reshape(self.n, -1)
+        if self.method == 'splu':
+            x = self._lu.solve(np.ascontiguousarray(rhs), trans='T' if trans else 'N')
+        elif self.method == 'neumann':
+            x = self._neumann(self._M.T if trans else self._M, rhs)
+        else:
+            x = self._krylov(self._I_M.T if trans else self._I_M, rhs)
+        return x.reshape(b.shape)
+
+    def inverse(self):
+        """Explicit dense inverse (I - M)^-1
+
+        Returns:
+            np.ndarray: Inverse
+        """
+        return self.solve(np.eye(self.n))
+
+
+class WoodburySolver:
+    """Solves (I - M - UV')x = b for a rank-k change UV' of the coefficients M, reusing the solver of (I - M) through the
+    Sherman-Morrison-Woodbury identity
+
+        (S - UV')^-1 = S^-1 + S^-1 U (I - V'S^-1 U)^-1 V'S^-1,    S = I - M
+
+    Setting it up takes k solves with the existing solver, O(n^2 k) for an LU factorization, instead of a new O(n^3)
+    factorization, and no n x n matrix is built.
+    """
+
+    def __init__(self, base, U, V):
+        """
+
+        Args:
+            base: Solver of (I - M), e.g. LUSolver or SparseSolver
+            U: Array of shape (n, k)
+            V: Array of shape (n, k)
+        """
+        self.n = base.n
+        self._base = base
+        self._U = np.asarray(U, dtype='float64').reshape(self.n, -1)
+        self._V = np.asarray(V, dtype='float64').reshape(self.n, -1)
+        assert self._U.shape == self._V.shape, "U and V must have the same shape"
+        self._factors = {}
+
+    def _factor(self, trans: bool):
+        # S^-1 U and the factorized k x k capacitance matrix, or S'^-1 V and its capacitance for the transposed solve
+        if trans not in self._factors:
+            P, Q = (self._V, self._U) if trans else (self._U, self._V)
+            W = np.asarray(self._base.solve(P, trans=trans), dtype='float64')
+            self._factors[trans] = W, lu_factor(np.eye(P.shape[1]) - Q.T @ W, check_finite=False)
+        return self._factors[trans]
+
+    def solve(self, b, trans: bool = False):
+        """Solve (I - M - UV')x = b, or (I - M - UV')'x = b if trans is true
+
+        Args:
+            b: Right hand side of shape (n,) or (n, k), multiple columns are solved at once
+            trans: Solve the transposed system
+
+        Returns:
+            np.ndarray: x with the same shape as b
+        """
+        b = np.asarray(b, dtype='float64')
+        y = np.asarray(self._base.solve(b.reshape(self.n, -1), trans=trans), dtype='float64')
+        W, capacitance = self._factor(trans)
+        Q = self._U if trans else self._V
+        x = y + W @ lu_solve(capacitance, Q.T @ y, check_finite=False)
+        return x.reshape(b.shape)
+
+    def inverse(self):
+        """Explicit inverse (I - M - UV')^-1
+
+        Returns:
+            np.ndarray: Inverse
+        """
+        return self.solve(np.eye(self.n))
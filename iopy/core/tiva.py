@@ -0,0 +1,175 @@
+"""  Created on 17/10/2026::
+------------- tiva -------------
+**Authors**: W. Wakker
+
+Trade in value added: the value added content of gross exports, split in domestic and foreign value added, and a
+Koopman-Wang-Wei style decomposition of gross exports. Everything is computed with multi-column solves of (I - A) and
+per country blocks, so that apart from the factorization of (I - A) no array larger than rs x countries is built.
+
+"""
+from iopy.core.base_io import IO
+from scipy import sparse
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+
+def countries(io: IO,
+              region_map: Optional[dict] = None):
+    """Country of every region-sector. Countries are the regions of FD_REGION; regions that are split in several
+    parts in Z (e.g. CN1 and CN2 in the OECD data) are mapped to the country whose code they start with.
+
+    Args:
+        io: IO instance
+        region_map: Mapping from region to country for regions that cannot be mapped automatically
+
+    Returns:
+        tuple: Integer country code of every region-sector, list of countries
+    """
+    country_list = list(io.FD_REGION.columns)
+    region_map = dict(region_map or {})
+    for region in io.X.row_index.regions:
+        if region in region_map:
+            continue
+        if region in country_list:
+            region_map[region] = region
+            continue
+        matches = [country for country in country_list if str(region).startswith(str(country))]
+        if len(matches) != 1:
+            raise ValueError(f'Country of region {region} not found, please specify it in region_map')
+        region_map[region] = matches[0]
+
+    codes = pd.Index(country_list).get_indexer([region_map[r] for r in io.X.row_index.regions])
+    if (codes < 0).any():
+        raise ValueError(f'Countries in region_map not found, please choose among {country_list}')
+    return codes[io.X.row_index.region_codes], country_list
+
+
+def _country_aggregator(codes: np.ndarray, num_countries: int):
+    # Sparse 0/1 matrix S of shape (countries, rs), such that S @ M sums the rows of M by country
+    return sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(num_countries, len(codes)))
+
+
+def _va_coefficients(io: IO):
+    return io.V.flatten().astype('float64') / io._x_filled().flatten()
+
+
+def gross_exports(io: IO,
+                  region_map: Optional[dict] = None):
+    """Gross exports of every region-sector by importing country, i.e. intermediate and final use by other countries
+
+    Args:
+        io: IO instance
+        region_map: Mapping from region to country, see countries
+
+    Returns:
+        pd.DataFrame: Exports with region-sectors in the rows and importing countries in the columns
+    """
+    codes, country_list = countries(io, region_map)
+    # Dense one-hot matrix instead of the sparse aggregator, which would copy Z into row-major order of Z'
+    one_hot = np.zeros((io.rs, len(country_list)))
+    one_hot[np.arange(io.rs), codes] = 1
+    exports = np.asarray(io.Z, dtype='float64') @ one_hot + np.asarray(io.FD_REGION, dtype='float64')
+    exports[np.arange(io.rs), codes] = 0
+    return pd.DataFrame(exports,
+                        index=pd.MultiIndex.from_tuples(io.X.rows, names=['region', 'sector']),
+                        columns=pd.Index(country_list, name='import_country'))
+
+
+def va_origin(io: IO,
+              region_map: Optional[dict] = None):
+    """Value added generated in each country per unit of output of each region-sector, i.e. the columns of v-hat L
+    summed by country, from one transposed solve with (I - A)
+
+    Args:
+        io: IO instance
+        region_map: Mapping from region to country, see countries
+
+    Returns:
+        pd.DataFrame: Value added shares with region-sectors in the rows and source countries in the columns
+    """
+    codes, country_list = countries(io, region_map)
+    rhs = np.zeros((io.rs, len(country_list)))
+    rhs[np.arange(io.rs), codes] = _va_coefficients(io)
+    return pd.DataFrame(np.asarray(io._solver('leontief').solve(rhs, trans=True), dtype='float64'),
+                        index=pd.MultiIndex.from_tuples(io.X.rows, names=['region', 'sector']),
+                        columns=pd.Index(country_list, name='source_country'))
+
+
+def va_in_exports(io: IO,
+                  by: str = 'country',
+                  region_map: Optional[dict] = None):
+    """Value added content of gross exports by source country. The value added of the exporting country itself is the
+    domestic value added in exports (DVA), the value added of other countries is the foreign value added (FVA)
+
+    Args:
+        io: IO instance
+        by: 'country' for exporting countries, or 'region-sector' for exporting region-sectors
+        region_map: Mapping from region to country, see countries
+
+    Returns:
+        pd.DataFrame: Value added with exporters in the rows and source countries in the columns
+    """
+    assert by in {'country', 'region-sector'}, "by must be 'country' or 'region-sector'"
+    exports = gross_exports(io, region_map).to_numpy().sum(1)
+    origin = va_origin(io, region_map)
+    va = origin.to_numpy() * exports[:, None]
+    if by == 'region-sector':
+        return pd.DataFrame(va, index=origin.index, columns=origin.columns)
+
+    codes, country_list = countries(io, region_map)
+    return pd.DataFrame(_country_aggregator(codes, len(country_list)) @ va,
+                        index=pd.Index(country_list, name='export_country'),
+                        columns=origin.columns)
+
+
+def decompose_exports(io: IO,
+                      region_map: Optional[dict] = None):
+    """Decomposition of the gross exports of every country in the style of Koopman, Wang and Wei (2014):
+
+    - vax: domestic value added absorbed abroad (value added exports)
+    - rdv: domestic value added that returns home and is absorbed there
+    - ddc: domestic double counting, domestic value added in exports counted more than once
+    - fva: foreign value added, including foreign double counting
+
+    with exports = dva + fva and dva = vax + rdv + ddc. The value added absorbed at home without ever being exported
+    follows from the local Leontief inverse of each country, which is solved per country block.
+
+    Args:
+        io: IO instance
+        region_map: Mapping from region to country, see countries
+
+    Returns:
+        pd.DataFrame: df with countries in the rows and columns exports, dva, fva, vax, rdv and ddc
+    """
+    codes, country_list = countries(io, region_map)
+    S = _country_aggregator(codes, len(country_list))
+    v = _va_coefficients(io)
+    exports = gross_exports(io, region_map).to_numpy().sum(1)
+    origin = va_origin(io, region_map).to_numpy()
+    own = np.arange(io.rs), codes
+
+    dva = S @ (exports * origin[own])
+    fva = S @ (exports * (origin.sum(1) - origin[own]))
+
+    # Value added of each region-sector absorbed by the final demand of each country
+    fd_region = np.asarray(io.FD_REGION, dtype='float64')
+    absorbed = v[:, None] * np.asarray(io._solver('leontief').solve(fd_region), dtype='float64')
+    vax = S @ (absorbed.sum(1) - absorbed[own])
+
+    # Value added absorbed at home through purely domestic production chains, per country block
+    x = io._x_filled().flatten().astype('float64')
+    domestic = np.zeros(io.rs)
+    for c in range(len(country_list)):
+        idx = np.flatnonzero(codes == c)
+        A_cc = np.asarray(io.Z[np.ix_(idx, idx)], dtype='float64') / x[idx]
+        domestic[idx] = v[idx] * np.linalg.solve(np.eye(len(idx)) - A_cc, fd_region[idx, c])
+    rdv = S @ (absorbed[own] - domestic)
+
+    return pd.DataFrame({'exports': S @ exports,
+                         'dva': dva,
+                         'fva': fva,
+                         'vax': vax,
+                         'rdv': rdv,
+                         'ddc': dva - vax - rdv},
+                        index=pd.Index(country_list, name='country'))
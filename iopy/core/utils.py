@@ -4,7 +4,10 @@
 
 """
 from iopy.core.globals import FILES_LOG
+from iopy.core.archives import close_archive
 from collections import defaultdict
+import numpy as np
+import pandas as pd
 import os
 
 
@@ -13,6 +16,36 @@ def assert_is_subset(subset, superset):
         raise ValueError(f'Not found: {set(subset).difference(superset)}')
 
 
+def single_block(df):
+    """DataFrame with all values in one float64 array, so that positional slices of it are views of that array.
+    No copy is made if the values already are a single float64 array
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        pd.DataFrame
+    """
+    return pd.DataFrame(df.to_numpy(dtype=np.float64, copy=False), index=df.index, columns=df.columns, copy=False)
+
+
+def frame_memory(df, shared=None):
+    """Memory held by a DataFrame, including its labels
+
+    Args:
+        df: DataFrame
+        shared: Array, e.g. a view of the values; values of df in the same memory are not counted
+
+    Returns:
+        int: Number of bytes
+    """
+    nbytes = int(df.memory_usage(index=True, deep=True).sum()) + df.columns.memory_usage(deep=True)
+    values = df.to_numpy(copy=False)
+    if shared is not None and np.may_share_memory(values, shared):
+        nbytes -= values.nbytes
+    return nbytes
+
+
 def replace_if_exists(x, mapping):
     """Replace if x exists in mapping, otherwise return x
 
@@ -53,10 +86,14 @@ def remove_downloaded_files(database: str = 'all',
             print(f'no files found for {database}, only for {list(files.keys())}')
             return
         other_files = {k: v for k, v in files.items() if k != database}
-        files = files[db]
+        files = files[database]
     else:
         files = {item for sublist in files.values() for item in sublist}
+    # Open archives cannot be removed on Windows
+    close_archive()
     for path in files:
+        if not os.path.exists(path):
+            continue
         os.remove(path)
         if verbose:
             print(f'Removed {path}')
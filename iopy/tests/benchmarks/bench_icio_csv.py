@@ -0,0 +1,56 @@
+"""  Created on 17/10/2026::
+------------- bench_icio_csv -------------
+**Authors**: W. Wakker
+
+Compare reading an ICIO csv file with read_icio_csv against plain pandas type inference, on a synthetic file with the
+size of the OECD 2021 tables. read_icio_csv uses pyarrow if installed. Run as
+python -m iopy.tests.benchmarks.bench_icio_csv
+
+"""
+from iopy.core.oecd import read_icio_csv, split_labels
+from iopy.core.utils import ALPHA3_TO_ALPHA2
+import numpy as np
+import pandas as pd
+import tempfile
+import time
+import os
+
+
+def icio_csv(path, num_regions=71, num_sectors=45, num_demand_items=6, seed=0):
+    rng = np.random.default_rng(seed)
+    regions = list(ALPHA3_TO_ALPHA2)[:num_regions]
+    rows = [f'{r}_{s:02d}' for r in regions for s in range(num_sectors)]
+    columns = rows + [f'{r}_D{d}' for r in regions for d in range(num_demand_items)] + ['TOTAL']
+    data = rng.uniform(0, 1000, (len(rows) + 2, len(columns))).round(4)
+    pd.DataFrame(data, index=rows + ['VALU', 'OUTPUT'], columns=columns).to_csv(path)
+
+
+def timed(f, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = f(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'icio.csv')
+        icio_csv(path)
+        t_old, df_old = timed(lambda: pd.read_csv(path, index_col=0))
+        t_new, df_new = timed(read_icio_csv, path)
+        pd.testing.assert_frame_equal(df_old, df_new)
+        print(f'{df_new.shape[0]} x {df_new.shape[1]} csv, {os.path.getsize(path) / 1e6:.0f} MB')
+        print(f'read_csv with type inference: {t_old:.2f} s')
+        print(f'read_icio_csv:                {t_new:.2f} s ({t_old / t_new:.1f}x)')
+
+        labels = df_new.index[:-2]
+        t_old, _ = timed(lambda: [(ALPHA3_TO_ALPHA2[r] if r in ALPHA3_TO_ALPHA2 else r, s)
+                                  for r, s in labels.str.split('_')])
+        t_new, _ = timed(split_labels, labels)
+        print(f'label splitting: {t_old * 1e3:.1f} ms -> {t_new * 1e3:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""  Created on 17/10/2026::
+------------- bench_suite -------------
+**Authors**: W. Wakker
+
+Benchmark suite on synthetic files of all databases, runs without network access. Requires pytest-benchmark. Run as
+python -m pytest iopy/tests/benchmarks/bench_suite.py --bench-regions 10
+or with --bench-full for tables of the size of the real data, and e.g. --benchmark-json=results.json to store the
+timings and peak RSS (extra_info) for comparison with --benchmark-compare.
+
+"""
+from iopy import OECD, Figaro, ExioBase, Panel
+from iopy.core.base_io import IO
+from iopy.core.oecd import read_icio_csv, csv_filename, extract_years
+from iopy.core.cache import cache_key, clear
+from iopy.core.archives import get_archive
+import numpy as np
+import pandas as pd
+import pytest
+import subprocess
+import sys
+
+pytest.importorskip('pytest_benchmark')
+
+DATABASES = {'oecd': (OECD, dict(version='2021', year=2018)),
+             'figaro': (Figaro, dict(version='2022', year=2020, kind='industry-by-industry')),
+             'exiobase': (ExioBase, dict(version='3.81', year=2022, kind='industry-by-industry'))}
+
+_instances = {}
+
+
+def load(database, **kwargs):
+    loader, arguments = DATABASES[database]
+    # The lru cache of _load_data would keep the parsed data of every instance alive
+    loader._load_data.cache_clear()
+    return loader(**arguments, **kwargs)
+
+
+@pytest.fixture(params=list(DATABASES))
+def io(request, synthetic_folder):
+    if request.param not in _instances:
+        _instances[request.param] = load(request.param)
+    return _instances[request.param]
+
+
+def test_import(benchmark):
+    # In a fresh interpreter, as imported modules are cached
+    benchmark.pedantic(subprocess.run, args=([sys.executable, '-c', 'import iopy'],), kwargs={'check': True},
+                       rounds=5, iterations=1)
+
+
+@pytest.mark.parametrize('database', list(DATABASES))
+def test_parse(measure, synthetic_folder, database):
+    if database == 'oecd':
+        def parse():
+            with get_archive(OECD(**DATABASES['oecd'][1])._data_file).open(csv_filename('2021', 2018)) as f:
+                return read_icio_csv(f)
+    elif database == 'figaro':
+        def parse():
+            return pd.read_csv(load('figaro', cache=False)._data_file, index_col=0)
+    else:
+        instance = load('exiobase', cache=False)
+
+        def parse():
+            return ExioBase._load_data.__wrapped__(instance)
+    measure(parse)
+
+
+@pytest.mark.parametrize('database', list(DATABASES))
+def test_load(measure, synthetic_folder, database):
+    measure(load, database, cache=False)
+
+
+@pytest.mark.parametrize('database', list(DATABASES))
+def test_load_cached(measure, synthetic_folder, database):
+    load(database)
+    measure(load, database)
+
+
+def test_extract_years(measure, synthetic_folder):
+    def extract():
+        for year in [2017, 2018]:
+            clear(cache_key('oecd', '2021', year))
+        return extract_years('2021', [2017, 2018])
+    measure(extract)
+
+
+def test_panel(measure, synthetic_folder):
+    measure(Panel, database='oecd', version='2021', years=[2017, 2018], max_workers=1)
+
+
+def test_init(measure, io):
+    measure(IO.__init__, io)
+
+
+def test_init_float32(measure, io):
+    measure(lambda: IO.__init__(io, dtype='float32') or IO.__init__(io))
+
+
+def test_factorize(measure, io):
+    def factorize():
+        IO.__init__(io)
+        return io._solver('leontief')
+    measure(factorize)
+
+
+def test_shock(measure, io):
+    io._solver('leontief')
+    measure(io.leontief_demand_shock, shock=-10, regions=io.regions[:2], sectors=io.sectors[:5])
+
+
+def test_shock_batch(measure, io):
+    io._solver('leontief')
+    shocks = np.random.default_rng(0).uniform(-10, 10, (io.rs, 100))
+    measure(io.leontief_demand_shock_batch, shocks)
+
+
+def test_ghosh_shock_batch(measure, io):
+    io._solver('ghosh')
+    shocks = np.random.default_rng(0).uniform(-10, 10, (io.rs, 100))
+    measure(io.ghosh_supply_shock_batch, shocks, as_frame=False)
+
+
+def test_get_imports_exports(measure, io):
+    measure(io.get_imports_exports, import_regions=io.regions[:2], export_regions=io.regions[2:],
+            export_sectors=io.sectors[:10])
+
+
+def test_plot(measure, io):
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    io._solver('leontief')
+
+    def plot():
+        io.leontief_demand_shock(shock=-10, regions=io.regions[:2], sectors=io.sectors[:5], plot=True,
+                                 plot_regions=io.regions[:2], show=False)
+        plt.close('all')
+    measure(plot)
@@ -0,0 +1,52 @@
+"""  Created on 17/10/2026::
+------------- bench_tiva -------------
+**Authors**: W. Wakker
+
+Compare the value added content of exports by country from iopy.core.tiva with the dense v-hat L E-hat product, on the
+OECD 2022-extended tables. Run as python -m iopy.tests.benchmarks.bench_tiva
+
+"""
+from iopy import OECD
+from iopy.core import tiva
+import numpy as np
+import tracemalloc
+import time
+
+
+def measured(f, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = f(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def dense_va_in_exports(io):
+    # v-hat L E-hat summed by source and exporting country
+    codes, country_list = tiva.countries(io)
+    exports = tiva.gross_exports(io).to_numpy().sum(1)
+    v = io.V.flatten() / io._x_filled().flatten()
+    vle = v[:, None] * np.asarray(io.L) * exports[None, :]
+    S = np.eye(len(country_list))[codes].T
+    return (S @ vle @ S.T).T
+
+
+def main(version='2022-extended', year=2018):
+    io = OECD(version=version, year=year)
+    io._solver('leontief')
+    print(f'OECD {version} {year}: {io.rs} region-sectors')
+
+    t_dense, m_dense, dense = measured(dense_va_in_exports, io)
+    t_tiva, m_tiva, df = measured(tiva.va_in_exports, io)
+    assert np.allclose(df.to_numpy(), dense)
+    print(f'dense v-hat L E-hat: {t_dense:.2f} s, peak {m_dense / 1e6:.0f} MB')
+    print(f'tiva.va_in_exports:  {t_tiva:.2f} s, peak {m_tiva / 1e6:.0f} MB')
+
+    t_decomposition, m_decomposition, _ = measured(tiva.decompose_exports, io)
+    print(f'tiva.decompose_exports: {t_decomposition:.2f} s, peak {m_decomposition / 1e6:.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""  Created on 17/10/2026::
+------------- conftest -------------
+**Authors**: W. Wakker
+
+Options and fixtures of the benchmark suite, see bench_suite
+
+"""
+from iopy.tests.benchmarks import synthetic
+from iopy.core.archives import close_archive
+import pytest
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-regions', type=int, default=10,
+                     help='Number of regions of the synthetic tables, the sectors are always those of config')
+    parser.addoption('--bench-full', action='store_true',
+                     help='Synthetic tables with the number of regions of config, i.e. the size of the real data')
+
+
+def reset_peak_rss():
+    """Reset the peak resident set size of the process, only possible on Linux
+
+    Returns:
+        bool: True if reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _status(field: str):
+    # Memory field of /proc/self/status in bytes, None if not available
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of the process in bytes, since the last reset_peak_rss on Linux
+
+    Returns:
+        int: Bytes, or None if unknown
+    """
+    peak = _status('VmHWM')
+    if peak is not None or resource is None:
+        return peak
+    # Kilobytes on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if os.uname().sysname == 'Darwin' else 1024)
+
+
+@pytest.fixture(scope='session')
+def synthetic_folder(request, tmp_path_factory):
+    """Data folder with synthetic files of all databases, iopy reads from and writes to this folder during the session"""
+    num_regions = None if request.config.getoption('--bench-full') else request.config.getoption('--bench-regions')
+    with synthetic.data_folder(str(tmp_path_factory.mktemp('data'))) as folder:
+        # 2017 and 2018 share one zip file, for the benchmarks of Panel and extract_years
+        for year in [2017, 2018]:
+            synthetic.oecd_zip('2021', year, num_regions=num_regions, seed=year)
+        synthetic.figaro_csv('industry-by-industry', 2020, num_regions=num_regions)
+        synthetic.exiobase_zip('industry-by-industry', 2022, num_regions=num_regions)
+        yield folder
+        close_archive()
+
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark a function and record the peak RSS of a first, untimed call in the extra info of the benchmark"""
+    def run(f, *args, rounds=3, **kwargs):
+        reset = reset_peak_rss()
+        rss = _status('VmRSS')
+        f(*args, **kwargs)
+        peak = peak_rss()
+        if peak is not None:
+            benchmark.extra_info['peak_rss_mb' if reset else 'process_peak_rss_mb'] = round(peak / 1e6, 1)
+        if reset and rss is not None:
+            benchmark.extra_info['peak_rss_increase_mb'] = round((peak - rss) / 1e6, 1)
+        return benchmark.pedantic(f, args=args, kwargs=kwargs, rounds=rounds, iterations=1)
+    return run
@@ -0,0 +1,232 @@
+"""  Created on 17/10/2026::
+------------- synthetic -------------
+**Authors**: W. Wakker
+
+Generator of synthetic OECD, Figaro and ExioBase files in the layout of the downloaded files, so that the loaders can be
+run without network access. The tables have the number of regions and sectors of config by default (3195, 3645, 2944,
+7987 and 9800 region-sectors), or fewer regions for quick runs. Use within data_folder, which redirects the data and
+cache folders to another folder and restores config afterwards, so real downloads are never overwritten.
+
+"""
+from iopy.core import cache, download, utils
+from iopy.core.archives import close_archive
+from iopy.core import globals as iopy_globals
+from iopy.core.config import config
+from iopy.core.download import data_source
+from iopy.core.oecd import csv_filename
+from iopy.core.mappings import (oecd_sector_name_mapping, oecd_sector_2022_2021_mapping, oecd_demand_items,
+                                figaro_sector_name_mapping_ixi_2022, figaro_sector_name_mapping_pxp_2022,
+                                figaro_demand_items)
+from iopy.core.utils import ALPHA3_TO_ALPHA2
+from contextlib import contextmanager
+from typing import Optional
+from zipfile import ZipFile, ZIP_DEFLATED
+import numpy as np
+import pandas as pd
+import copy
+import json
+import shutil
+import os
+
+FLOAT_FORMAT = '%.6g'
+
+
+@contextmanager
+def data_folder(folder: str):
+    """Redirect the data folder, cache and files log of iopy to a folder and restore them and config afterwards
+
+    Args:
+        folder: Folder to store the synthetic files in
+    """
+    os.makedirs(folder, exist_ok=True)
+    saved_config = copy.deepcopy(config)
+    names = {'DATA_FOLDER': folder,
+             'FILES_LOG': os.path.join(folder, '_files_log.txt'),
+             'CACHE_FOLDER': os.path.join(folder, '_cache')}
+    modules = [iopy_globals, download, cache, utils]
+    saved = [(module, name, getattr(module, name)) for module in modules for name in names if hasattr(module, name)]
+    for module, name, _ in saved:
+        setattr(module, name, names[name])
+    try:
+        yield folder
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+        config.clear()
+        config.update(saved_config)
+
+
+def _write_member(path: str, name: str, data: str):
+    # Several years share one zip file, so a member is added to an existing file and only replaces its own old version
+    close_archive(path)
+    if not os.path.exists(path):
+        with ZipFile(path, 'w', ZIP_DEFLATED) as zf:
+            zf.writestr(name, data)
+        return
+    with ZipFile(path, 'r') as zf:
+        replace = name in zf.namelist()
+    if not replace:
+        with ZipFile(path, 'a', ZIP_DEFLATED) as zf:
+            zf.writestr(name, data)
+        return
+    with ZipFile(path, 'r') as old, ZipFile(path + '.tmp', 'w', ZIP_DEFLATED) as new:
+        for member in old.infolist():
+            if member.filename != name:
+                with old.open(member) as src, new.open(member.filename, 'w') as dst:
+                    shutil.copyfileobj(src, dst)
+        new.writestr(name, data)
+    os.replace(path + '.tmp', path)
+
+
+def _labels(known: list, n: int, prefix: str):
+    # The first n known labels, padded with synthetic ones
+    return list(known[:n]) + [f'{prefix}{i:03d}' for i in range(n - len(known))]
+
+
+def _flows(num_rows: int, num_columns: int, rng: np.random.Generator, density: float = 0.7):
+    flows = rng.lognormal(0, 2, (num_rows, num_columns))
+    flows[rng.uniform(size=flows.shape) > density] = 0
+    return flows
+
+
+def oecd_zip(version: str = '2021',
+             year: int = 2018,
+             num_regions: Optional[int] = None,
+             seed: int = 0):
+    """Write a year of the OECD ICIO tables to its zip file, which is added to the zip file if that holds other years
+
+    Args:
+        version: Publication version of the data; '2021', '2022-small' or '2022-extended'
+        year: Year
+        num_regions: Number of regions, the number of config by default; config is adjusted if different
+        seed: Seed of the random numbers
+
+    Returns:
+        str: Path of the zip file
+    """
+    settings = config['oecd'][version]
+    if num_regions is not None:
+        settings['num_regions'] = num_regions
+    rng = np.random.default_rng(seed)
+    regions = _labels(list(ALPHA3_TO_ALPHA2), settings['num_regions'], 'R')
+    known = list(oecd_sector_name_mapping) if version == '2021' else list(oecd_sector_2022_2021_mapping)
+    sectors = _labels(known, settings['num_sectors'], 'S')
+    rows = [f'{r}_{s}' for r in regions for s in sectors]
+    fd_columns = [f'{r}_{d}' for r in regions for d in oecd_demand_items]
+
+    z = _flows(len(rows), len(rows), rng)
+    fd = _flows(len(rows), len(fd_columns), rng) * 10
+    taxes = rng.uniform(0, 0.1, (len(regions), len(rows) + len(fd_columns)))
+    x = z.sum(1) + fd.sum(1)
+    va = x - z.sum(0) - taxes[:, :len(rows)].sum(0)
+    padding = np.zeros(len(fd_columns) + 1)
+    data = np.vstack([np.hstack([z, fd, x[:, None]]),
+                      np.hstack([taxes, np.zeros((len(regions), 1))]),
+                      np.hstack([va, padding]),
+                      np.hstack([x, padding])])
+    df = pd.DataFrame(data,
+                      index=rows + [f'TLS_{r}' for r in regions] + ['VALU' if version == '2021' else 'VA',
+                                                                   'OUTPUT' if version == '2021' else 'OUT'],
+                      columns=rows + fd_columns + ['TOTAL'])
+    df.index.name = 'V1'
+
+    _, path = data_source('oecd', version, year)
+    _write_member(path, csv_filename(version, year), df.to_csv(float_format=FLOAT_FORMAT))
+    return path
+
+
+def figaro_csv(kind: str = 'industry-by-industry',
+               year: int = 2020,
+               num_regions: Optional[int] = None,
+               seed: int = 0):
+    """Write the csv file of a year of the Figaro tables
+
+    Args:
+        kind: industry-by-industry or product-by-product
+        year: Year
+        num_regions: Number of regions, the number of config by default; config is adjusted if different
+        seed: Seed of the random numbers
+
+    Returns:
+        str: Path of the csv file
+    """
+    settings = config['figaro']['2022']
+    if num_regions is not None:
+        settings['num_regions'] = num_regions
+    rng = np.random.default_rng(seed)
+    regions = _labels(list(ALPHA3_TO_ALPHA2.values()), settings['num_regions'], 'R')
+    known = list(figaro_sector_name_mapping_ixi_2022 if kind == 'industry-by-industry'
+                 else figaro_sector_name_mapping_pxp_2022)
+    sectors = _labels(known, settings['num_sectors'], 'S')
+    rows = [f'{r}_{s}' for r in regions for s in sectors]
+    fd_columns = [f'{r}_{d}' for r in regions for d in figaro_demand_items]
+    va_rows = [f'W2_{item}' for item in ['D1', 'D29X39', 'B2A3G', 'D21X31', 'OP_RES', 'OP_NRES']]
+
+    z = _flows(len(rows), len(rows), rng)
+    fd = _flows(len(rows), len(fd_columns), rng) * 10
+    va = rng.uniform(0, 1, (len(va_rows), len(rows))) * (z.sum(1) + fd.sum(1)) / len(va_rows)
+    df = pd.DataFrame(np.vstack([np.hstack([z, fd]), np.hstack([va, np.zeros((len(va_rows), len(fd_columns)))])]),
+                      index=rows + va_rows,
+                      columns=rows + fd_columns)
+    df.index.name = 'rowLabels'
+
+    _, path = data_source('figaro', '2022', year, kind)
+    df.to_csv(path, float_format=FLOAT_FORMAT)
+    return path
+
+
+def exiobase_zip(kind: str = 'industry-by-industry',
+                 year: int = 2022,
+                 num_regions: Optional[int] = None,
+                 num_stressors: int = 100,
+                 seed: int = 0):
+    """Write the zip file of a year of the ExioBase tables, with tab separated tables in a folder per year and kind and
+    a satellite extension
+
+    Args:
+        kind: industry-by-industry or product-by-product
+        year: Year
+        num_regions: Number of regions, the number of config by default; config is adjusted if different
+        num_stressors: Number of stressors of the satellite extension
+        seed: Seed of the random numbers
+
+    Returns:
+        str: Path of the zip file
+    """
+    settings = config['exiobase']['3.81']
+    if num_regions is not None:
+        settings['num_regions'][kind] = num_regions
+    rng = np.random.default_rng(seed)
+    regions = _labels(list(ALPHA3_TO_ALPHA2.values()), settings['num_regions'][kind], 'R')
+    sectors = [f'Sector {i:03d}' for i in range(settings['num_sectors'][kind])]
+    categories = ['Final consumption expenditure by households', 'Final consumption expenditure by government',
+                  'Gross fixed capital formation', 'Changes in inventories']
+    stressors = [f'Stressor {i:04d} - air' for i in range(num_stressors)]
+    rows = pd.MultiIndex.from_tuples([(r, s) for r in regions for s in sectors], names=['region', 'sector'])
+    fd_columns = pd.MultiIndex.from_tuples([(r, c) for r in regions for c in categories], names=['region', 'category'])
+
+    z = _flows(len(rows), len(rows), rng, density=0.3)
+    fd = _flows(len(rows), len(fd_columns), rng) * 10
+    tables = {'Z': pd.DataFrame(z, index=rows, columns=rows),
+              'Y': pd.DataFrame(fd, index=rows, columns=fd_columns),
+              'x': pd.DataFrame({'indout': z.sum(1) + fd.sum(1)}, index=rows),
+              'satellite/F': pd.DataFrame(_flows(num_stressors, len(rows), rng),
+                                          index=pd.Index(stressors, name='stressor'), columns=rows),
+              'satellite/F_Y': pd.DataFrame(_flows(num_stressors, len(fd_columns), rng, density=0.2),
+                                            index=pd.Index(stressors, name='stressor'), columns=fd_columns),
+              'satellite/unit': pd.DataFrame({'unit': 'kg'}, index=pd.Index(stressors, name='stressor'))}
+    codes = {'industries' if kind == 'industry-by-industry' else 'products':
+             pd.DataFrame({'Number': range(1, len(sectors) + 1), 'Name': sectors,
+                           'CodeNr': [f'C{i:03d}' for i in range(len(sectors))]}),
+             'finaldemands': pd.DataFrame({'Number': range(1, len(categories) + 1), 'Name': categories,
+                                           'CodeNr': [f'F{i:02d}' for i in range(len(categories))]})}
+
+    folder = f'IOT_{year}_{"ixi" if kind == "industry-by-industry" else "pxp"}'
+    _, path = data_source('exiobase', '3.81', year, kind)
+    with ZipFile(path, 'w', ZIP_DEFLATED) as zf:
+        for name, table in tables.items():
+            zf.writestr(f'{folder}/{name}.txt', table.to_csv(sep='\t', float_format=FLOAT_FORMAT))
+        for name, table in codes.items():
+            zf.writestr(f'{folder}/{name}.txt', table.to_csv(sep='\t', index=False))
+        zf.writestr(f'{folder}/metadata.json', json.dumps({'description': {'synthetic': True}}))
+    return path
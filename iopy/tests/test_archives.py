@@ -0,0 +1,74 @@
+"""  Created on 17/10/2026::
+------------- test_archives -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.archives import get_archive, close_archive, hold_archive, read_members, _archives
+from iopy.core.download import log_file
+from iopy.core.utils import remove_downloaded_files
+from zipfile import ZipFile
+import tempfile
+import gc
+import time
+import os
+
+
+def write_zip(path, members):
+    with ZipFile(path, 'w') as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+
+class TestArchives:
+
+    def test_shared(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.zip')
+            write_zip(path, {'a.csv': 'a', 'b.csv': 'b'})
+            archive = get_archive(path)
+            assert get_archive(path) is archive
+
+            # Reopened once the file changes
+            time.sleep(.01)
+            write_zip(path, {'a.csv': 'a', 'b.csv': 'b', 'c.csv': 'c'})
+            assert get_archive(path) is not archive
+            assert len(get_archive(path).namelist()) == 3
+
+            close_archive(path)
+            assert os.path.abspath(path) not in _archives
+
+    def test_read_members(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.zip')
+            write_zip(path, {f'{i}.csv': str(i) * 1000 for i in range(10)})
+            parsed = read_members(path, [f'{i}.csv' for i in range(10)], lambda f: len(f.read()), max_workers=4)
+            assert parsed == {f'{i}.csv': 1000 for i in range(10)}
+            close_archive()
+            assert not _archives
+
+    def test_hold(self):
+        class Owner:
+            pass
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.zip')
+            write_zip(path, {'a.csv': 'a'})
+            first, second = Owner(), Owner()
+            hold_archive(path, first)
+            hold_archive(path, second)
+            archive = get_archive(path)
+            del first
+            gc.collect()
+            assert get_archive(path) is archive
+            del second
+            gc.collect()
+            assert os.path.abspath(path) not in _archives and archive.fp is None
+
+    def test_remove(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.zip')
+            write_zip(path, {'a.csv': 'a'})
+            archive = get_archive(path)
+            log_file('test', path)
+            remove_downloaded_files(database='test', verbose=False)
+            assert not os.path.exists(path) and archive.fp is None
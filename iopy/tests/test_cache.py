@@ -0,0 +1,65 @@
+"""  Created on 17/10/2026::
+------------- test_cache -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.cache import cache_key, save_array, load_array, save_frame, load_frame, clear
+from iopy.core.globals import DATA_FOLDER, FILES_LOG
+from iopy.core.utils import remove_downloaded_files
+import pandas as pd
+import numpy as np
+import os
+
+key = cache_key('test', '2022', 2018, 'industry-by-industry')
+df = pd.DataFrame(np.arange(6, dtype='float64').reshape(3, 2),
+                  index=pd.MultiIndex.from_tuples([('AT', 'A'), ('AT', 'B'), ('BE', 'A')], names=['region', 'sector']),
+                  columns=['x', 'y'])
+
+
+class TestCache:
+
+    def test_key(self):
+        assert key == 'test_2022_2018_industry-by-industry'
+        assert cache_key('test', '2021', 2018) == 'test_2021_2018'
+
+    def test_frame(self):
+        save_frame(key, 'df', df)
+        pd.testing.assert_frame_equal(load_frame(key, 'df'), df)
+
+    def test_array(self):
+        save_array(key, 'L', np.eye(3), df.index.to_list(), df.index.to_list())
+        array, rows, columns, _ = load_array(key, 'L')
+        assert np.array_equal(array, np.eye(3))
+        assert rows == columns == [('AT', 'A'), ('AT', 'B'), ('BE', 'A')]
+        assert load_array(key, 'something') is None
+
+    def test_dtype(self):
+        save_array(key, 'L_float32', np.eye(3, dtype='float32'), df.index.to_list(), df.index.to_list())
+        assert load_array(key, 'L_float32')[0].dtype == np.float32
+        assert load_array(key, 'L_float32', mmap_mode='r')[0].dtype == np.float32
+        save_array(key, 'L', np.eye(3, dtype='int64'), df.index.to_list(), df.index.to_list())
+        assert load_array(key, 'L')[0].dtype == np.float64
+
+    def test_log(self):
+        save_frame(key, 'df', df)
+        save_frame(key, 'df', df)
+        with open(FILES_LOG, 'r') as files_log:
+            entries = [line for line in files_log if line.startswith('test;') and 'df.npy' in line]
+        assert len(entries) == 1
+
+    def test_source(self):
+        source = os.path.join(DATA_FOLDER, 'test_source.txt')
+        with open(source, 'w') as f:
+            f.write('a')
+        save_frame(key, 'df', df, source=source)
+        assert load_frame(key, 'df', source=source) is not None
+        with open(source, 'w') as f:
+            f.write('ab')
+        assert load_frame(key, 'df', source=source) is None
+        os.remove(source)
+
+    def test_clear(self):
+        save_frame(key, 'df', df)
+        clear(key)
+        assert load_frame(key, 'df') is None
+        remove_downloaded_files(database='test', verbose=False)
@@ -0,0 +1,119 @@
+"""  Created on 17/10/2026::
+------------- test_download -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core import download as download_module
+from iopy.core.config import config
+from iopy.core.download import download, prefetch, log_file
+from iopy.tests.benchmarks.synthetic import data_folder
+from iopy.core.utils import remove_downloaded_files
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import hashlib
+import tempfile
+import pytest
+import os
+
+CONTENT = os.urandom(300_000)
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Serves CONTENT with Range support, the first response of /drop is cut off halfway
+    dropped = False
+
+    def do_GET(self):
+        start = 0
+        if 'Range' in self.headers:
+            start = int(self.headers['Range'].split('=')[1].rstrip('-'))
+        if start >= len(CONTENT):
+            self.send_response(416)
+            self.end_headers()
+            return
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header('Content-Range', f'bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}')
+        self.send_header('Content-Length', str(len(CONTENT) - start))
+        self.end_headers()
+        body = CONTENT[start:]
+        if self.path == '/drop' and not Handler.dropped:
+            Handler.dropped = True
+            body = body[:len(body) // 2]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    remove_downloaded_files('test', verbose=False)
+
+
+class TestDownload:
+
+    def test_download(self, server):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.bin')
+            download(server + '/data', path, 'test', sha256=hashlib.sha256(CONTENT).hexdigest())
+            with open(path, 'rb') as f:
+                assert f.read() == CONTENT
+            assert not os.path.exists(path + '.part')
+
+    def test_resume(self, server):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.bin')
+            download(server + '/drop', path, 'test')
+            assert Handler.dropped
+            with open(path, 'rb') as f:
+                assert f.read() == CONTENT
+
+            # Leftover partial file from an earlier run
+            with open(path + '.part', 'wb') as f:
+                f.write(CONTENT[:1000])
+            os.remove(path)
+            download(server + '/data', path, 'test')
+            with open(path, 'rb') as f:
+                assert f.read() == CONTENT
+
+    def test_integrity(self, server):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'data.bin')
+            with pytest.raises(IOError):
+                download(server + '/data', path, 'test', sha256='0' * 64)
+            with pytest.raises(IOError):
+                download(server + '/data', path, 'test', size=len(CONTENT) + 1)
+            with pytest.raises(IOError):
+                download(server + '/data', os.path.join(folder, 'data.zip'), 'test')
+            assert os.listdir(folder) == []
+
+    def test_prefetch(self, server):
+        file_ids = ['00000000-0000-0000-0000-00000000000' + str(i) for i in range(3)]
+        with tempfile.TemporaryDirectory() as folder, data_folder(folder):
+            # data_folder restores config afterwards
+            links = config['figaro']['2022']['links']['industry-by-industry']
+            for year, file_id in zip([2010, 2011, 2012], file_ids):
+                links[year] = f'{server}/{file_id}'
+            items = [('figaro', '2022', year, 'industry-by-industry') for year in [2010, 2011, 2012, 2012]]
+            paths = prefetch(items, max_workers=3)
+            assert sorted(paths) == sorted(os.path.join(folder, file_id + '.csv') for file_id in file_ids)
+            for path in paths:
+                with open(path, 'rb') as f:
+                    assert f.read() == CONTENT
+            with open(download_module.FILES_LOG, 'r') as files_log:
+                assert sorted(files_log.read().splitlines()) == sorted('figaro;' + path for path in paths)
+            assert prefetch(items) == []
+
+    def test_log_file(self, monkeypatch):
+        # The data folder does not exist before the first download
+        with tempfile.TemporaryDirectory() as folder:
+            files_log = os.path.join(folder, 'data', '_files_log.txt')
+            monkeypatch.setattr(download_module, 'FILES_LOG', files_log)
+            log_file('test', 'data.bin')
+            log_file('test', 'data.bin')
+            with open(files_log, 'r') as f:
+                assert f.read() == 'test;data.bin\n'
@@ -0,0 +1,53 @@
+"""  Created on 17/10/2026::
+------------- test_dynamic -------------
+**Authors**: W. Wakker
+
+"""
+from iopy import OECD
+from iopy.core.dynamic import ARIO
+import numpy as np
+import pytest
+
+oecd = OECD(version='2021', year=2018)
+model = ARIO(oecd)
+
+
+class TestARIO:
+
+    def test_steady_state(self):
+        result = model.simulate(30)
+        assert result.shape == (31, oecd.rs)
+        assert np.allclose(result, oecd.X.flatten())
+
+    def test_capacity_shock(self):
+        result = model.simulate(200, capacity=(20, ['NL'], ['20']), recovery=100)
+        nl = oecd.X.row_index.positions(regions=['NL'], sectors=['20'])
+        assert np.allclose(result[1, nl], 0.8 * oecd.X.flatten()[nl])
+        assert np.allclose(result[-1], oecd.X.flatten(), rtol=1e-3)
+
+    def test_demand_shock(self):
+        result = model.simulate(50, demand=np.full(oecd.rs, 10.), record='demand')
+        x = oecd.X.flatten()
+        assert np.allclose(result[1], x + 0.1 * (x - oecd.Z.sum(1)))
+        unmet = model.simulate(50, capacity=(50, ['DE'], ['29']), record='unmet')
+        de = oecd.X.row_index.positions(regions=['DE'], sectors=['29'])
+        # Half of the final demand for the products of DE 29 is not delivered in the first step
+        assert (unmet >= 0).all()
+        assert np.allclose(unmet[1, de], 0.5 * (x - np.asarray(oecd.Z).sum(1))[de])
+
+        with pytest.raises(ValueError):
+            model.simulate(10, record='inventory')
+
+    def test_batch(self):
+        scenarios = [{'steps': 20, 'capacity': (shock, ['NL'], ['20'])} for shock in [10, 20, 30]]
+        result = model.simulate_batch(scenarios, max_workers=2)
+        assert result.shape == (3, 21, oecd.rs)
+        assert np.allclose(result, model.simulate_batch(scenarios, max_workers=1))
+        assert np.allclose(result[1], model.simulate(**scenarios[1]))
+        assert not np.allclose(result[0], result[2])
+
+    def test_labels(self):
+        with pytest.raises(ValueError):
+            model.simulate(10, capacity=(20, ['NL'], ['C20']))
+        with pytest.raises(ValueError):
+            model.simulate(10, demand=(20, ['XX'], ['20']))
@@ -4,6 +4,9 @@
 
 """
 from iopy import ExioBase
+from iopy.core.cache import cache_key, is_cached
+import numpy as np
+import pandas as pd
 
 
 class TestExioBase:
@@ -13,3 +16,21 @@ class TestExioBase:
         assert set(ex.sectors).issubset(ex.sector_name_mapping)
         ex = ExioBase(version='3.81', year=2022, kind='product-by-product')
         assert set(ex.sectors).issubset(ex.sector_name_mapping)
+
+    def test_footprint(self):
+        ex = ExioBase(version='3.81', year=2022, kind='industry-by-industry', extension='satellite')
+        assert ex.F.shape == (len(ex.stressor_units), ex.rs)
+        assert ex.F_Y.columns == ex.FD_GRAN.columns
+        # The extension is cached under the key of the loader, also when the inverses are not cached
+        assert ex._cache_key == cache_key('exiobase', '3.81', 2022, 'industry-by-industry')
+        assert is_cached(ex._cache_key, 'satellite_F')
+
+        stressors = ex.F.rows[:3]
+        df = ex.footprint(stressors=stressors)
+        S = np.asarray(ex.F)[:3] / ex._x_filled().flatten()
+        direct = pd.DataFrame(np.asarray(ex.F_Y)[:3], columns=[r for r, c in ex.F_Y.columns]).T.groupby(level=0).sum().T
+        assert np.allclose(df.to_numpy(), S @ np.asarray(ex.L @ ex.FD_REGION) + direct[df.columns].to_numpy())
+        by_product = ex.footprint(stressors=stressors, by='region-sector')
+        assert np.allclose(by_product.sum(1), df.sum(1))
+        assert by_product.columns.nlevels == 2 and ('final_demand', 'direct') in by_product.columns
+        assert np.allclose(ex.multipliers(stressors=stressors).to_numpy(), S @ np.asarray(ex.L))
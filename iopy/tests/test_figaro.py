@@ -45,10 +45,10 @@ class TestFigaro:
         assert np.isclose(f.X, x, atol=.001).all()
 
     def test_shock(self):
-        assert np.array_equal(f._shock(model='ghosh', custom_shock_vector=custom_shock_vector),
+        assert np.allclose(f._shock(model='ghosh', custom_shock_vector=custom_shock_vector),
                               (f.G.T @ (f.V.T * (custom_shock_vector / 100))) + f.X)
 
-        assert np.array_equal(f._shock(model='leontief', custom_shock_vector=custom_shock_vector),
+        assert np.allclose(f._shock(model='leontief', custom_shock_vector=custom_shock_vector),
                               ((np.eye(f.rs) - f.A).I @ (
                                       f.FD * (custom_shock_vector / 100))) + f.X)
 
@@ -56,10 +56,10 @@ class TestFigaro:
             f._shock(model='leontief')
 
         shock_vector = np.array([-.1 if r in EA and s == 'A01' else 0 for r, s in f.X.rows]).reshape(-1, 1)
-        assert np.array_equal(f._shock(model='ghosh', shock=-10, regions=EA, sectors=['A01']),
+        assert np.allclose(f._shock(model='ghosh', shock=-10, regions=EA, sectors=['A01']),
                               (f.G.T @ (f.V.T * (shock_vector.astype('float64')))) + f.X)
 
-        assert np.array_equal(f._shock(model='leontief', shock=-10, regions=EA, sectors=['A01']),
+        assert np.allclose(f._shock(model='leontief', shock=-10, regions=EA, sectors=['A01']),
                               ((np.eye(f.rs) - f.A).I @ (
                                       f.FD * shock_vector.astype('float64'))) + f.X)
 
@@ -142,5 +142,12 @@ class TestFigaro:
                               import_sectors='A01',
                               use_type='both')
 
+    def test_low_memory(self):
+        f_low = Figaro(version='2022', year=2018, kind='industry-by-industry', low_memory=True)
+        assert f_low.df is None and f_low.memory_saved > 0
+        for attr in ['Z', 'FD_GRAN', 'X', 'V', 'FD_REGION']:
+            assert np.array_equal(getattr(f_low, attr), getattr(f, attr))
+        assert np.array_equal(f_low.ADD['GVA_GRAN'], f.ADD['GVA_GRAN'])
+
     def test_remove_local_files(self):
         f.remove_downloaded_files()
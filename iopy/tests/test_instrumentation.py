@@ -0,0 +1,98 @@
+"""  Created on 17/10/2026::
+------------- test_instrumentation -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.instrumentation import Spans, Stages, span, traced, instrumented, configure, add_hook, remove_hook
+import numpy as np
+import pytest
+import pickle
+import tracemalloc
+import json
+
+
+@traced('allocate')
+def allocate(n):
+    return np.ones(n)
+
+
+class Model:
+
+    @instrumented('run')
+    def run(self):
+        return allocate(1000).sum()
+
+
+class TestInstrumentation:
+
+    def test_span(self):
+        spans = Spans()
+        with span('outer', spans=spans, scenarios=3):
+            with span('inner'):
+                pass
+        assert [s['path'] for s in spans] == ['outer/inner', 'outer']
+        assert spans[1]['attributes'] == {'scenarios': 3}
+        assert spans[1]['wall'] >= spans[0]['wall'] >= 0
+        assert spans[0]['peak_bytes'] is None
+
+    def test_memory(self):
+        spans = Spans()
+        configure(memory=True)
+        try:
+            with span('outer', spans=spans):
+                allocate(10 ** 6)
+                allocate(10)
+        finally:
+            configure(memory=False)
+        inner, _, outer = spans
+        assert inner['peak_bytes'] >= 8 * 10 ** 6
+        assert outer['peak_bytes'] >= inner['peak_bytes']
+
+    def test_memory_without_reset(self, monkeypatch):
+        # Python < 3.9 has no tracemalloc.reset_peak
+        monkeypatch.delattr(tracemalloc, 'reset_peak')
+        spans = Spans()
+        configure(memory=True)
+        try:
+            with span('outer', spans=spans):
+                allocate(10 ** 6)
+        finally:
+            configure(memory=False)
+        assert spans[-1]['peak_bytes'] >= 8 * 10 ** 6
+
+    def test_stages(self):
+        spans = Spans()
+        with Stages('load', spans) as stage:
+            stage('parse')
+            allocate(10)
+            stage('matrices')
+        assert [s['path'] for s in spans] == ['load/parse/allocate', 'load/parse', 'load/matrices', 'load']
+
+    def test_instrumented(self):
+        model = Model()
+        model.run()
+        model.run()
+        summary = model.spans.summary()
+        assert summary['run']['calls'] == summary['run/allocate']['calls'] == 2
+        assert json.loads(model.spans.to_json())['summary']['run']['calls'] == 2
+        assert len(pickle.loads(pickle.dumps(model.spans))) == 4
+
+    def test_hook(self):
+        records = []
+        add_hook(records.append)
+        try:
+            with span('outer'):
+                pass
+        finally:
+            remove_hook(records.append)
+        assert [r['name'] for r in records] == ['outer']
+
+        def failing(record):
+            raise RuntimeError
+        add_hook(failing)
+        try:
+            with pytest.warns(UserWarning, match='hook'):
+                with span('outer'):
+                    pass
+        finally:
+            remove_hook(failing)
@@ -4,6 +4,8 @@
 
 """
 import iopy
+import subprocess
+import sys
 
 
 class TestIopy:
@@ -13,3 +15,16 @@ class TestIopy:
 
     def test_folder_size(self):
         assert isinstance(iopy.get_size_data_folder(), str)
+
+    def test_import(self):
+        # Importing iopy in a fresh interpreter on a read-only install must not import the heavy dependencies or create
+        # the data folder
+        code = ("import os, sys\n"
+                "def read_only(*args, **kwargs): raise PermissionError\n"
+                "os.mkdir = os.makedirs = read_only\n"
+                "import iopy\n"
+                "print(sorted({'pandas', 'matplotlib', 'scipy', 'tqdm'} & set(sys.modules)))\n"
+                "iopy.Figaro\n"
+                "print('matplotlib' in sys.modules)")
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        assert output.split() == ['[]', 'False']
@@ -3,10 +3,13 @@
 **Authors**: W. Wakker
 
 """
-from iopy.core.matrix import Matrix
+from iopy.core.matrix import Matrix, LabelIndex
 import pandas as pd
 import numpy as np
 import pytest
+import tempfile
+import pickle
+import os
 from iopy.core.utils import ALPHA3_TO_ALPHA2
 
 
@@ -52,4 +55,43 @@ class TestMatrix:
         assert np.array_equal(np.array(m33.transpose()), df_33.to_numpy().transpose())
 
     def test_flatten(self):
-        assert np.array_equal(m33.flatten(), df_33.to_numpy().flatten())
\ No newline at end of file
+        assert np.array_equal(m33.flatten(), df_33.to_numpy().flatten())
+
+    def test_pickle(self):
+        m = pickle.loads(pickle.dumps(m33))
+        assert np.array_equal(m, m33)
+        assert (m.info, m.rows, m.columns) == (m33.info, m33.rows, m33.columns)
+
+    def test_memmap(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'm33.npy')
+            np.save(path, df_33.to_numpy())
+            mm = np.load(path, mmap_mode='r')
+            m = Matrix('something', mm, m33.rows, m33.columns)
+            assert np.shares_memory(m, mm)
+            assert (m.info, m.rows, m.columns) == ('something', m33.rows, m33.columns)
+            assert m[:2].info == 'something' and m.T.rows == m33.columns
+            assert np.array_equal(np.array(m.I), np.linalg.inv(df_33.to_numpy()))
+            del m, mm
+
+
+class TestLabelIndex:
+
+    def test_mask(self):
+        index = LabelIndex([('AT', 'A'), ('AT', 'B'), ('BE', 'A'), ('BE', 'B')])
+        assert index.mask(regions=['AT']).tolist() == [True, True, False, False]
+        assert index.mask(regions='BE', sectors=['A', 'something']).tolist() == [False, False, True, False]
+        assert index.mask().all()
+        assert index.positions(sectors=['B']).tolist() == [1, 3]
+
+    def test_plain_labels(self):
+        index = LabelIndex(['AT', 'BE', 'CN'])
+        assert index.positions(regions=['CN', 'AT']).tolist() == [0, 2]
+        with pytest.raises(AssertionError):
+            index.mask(sectors=['A'])
+
+    def test_matrix(self):
+        assert m33.row_index.positions(regions=['b']).tolist() == [1]
+        assert m33.row_index is m33.row_index
+        assert m13.col_index.positions(sectors=['c']).tolist() == [2]
+        assert m33.T.col_index.labels is m33.rows
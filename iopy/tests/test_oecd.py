@@ -4,8 +4,12 @@
 
 """
 import pytest
-from iopy import OECD
+from iopy import OECD, Panel
+from iopy.core.oecd import extract_years, read_icio_csv, split_labels, data_file, csv_filename
+from iopy.core.mappings import oecd_sector_name_mapping_simple
 import numpy as np
+import pandas as pd
+from zipfile import ZipFile
 import matplotlib
 import matplotlib.pyplot as plt
 
@@ -35,6 +39,21 @@ class TestOECD:
             for attr_attr in ['info', 'rows', 'columns', 'I']:
                 assert attr_attr in dir(getattr(oecd, attr))
 
+    def test_spans(self):
+        o = OECD(version='2021', year=2018, progress=False)
+        o.leontief_demand_shock(shock=-10, regions=['CN'], sectors=o.sectors)
+        summary = o.spans.summary()
+        assert {'load', 'load/parse', 'load/matrices', 'load/init', 'shock', 'shock/factorize'}.issubset(summary)
+        assert summary['load']['wall'] >= summary['load/parse']['wall']
+
+    def test_lazy(self):
+        o = OECD(version='2021', year=2018)
+        o.get_imports_exports(import_regions='CN', export_regions='AU')
+        assert o._L is None and o._G is None
+        o.L
+        assert o._L is not None and o._G is None
+        assert o.L is o.L
+
     def test_leontief(self):
         fd = (np.eye(oecd.rs) - oecd.A) @ oecd.X
         assert np.isclose(oecd.FD, fd, atol=.001).all()
@@ -47,10 +66,10 @@ class TestOECD:
         assert np.isclose(oecd.X, x, atol=.001).all()
 
     def test_shock(self):
-        assert np.array_equal(oecd._shock(model='ghosh', custom_shock_vector=custom_shock_vector),
+        assert np.allclose(oecd._shock(model='ghosh', custom_shock_vector=custom_shock_vector),
                               (oecd.G.T @ (oecd.V.T * (custom_shock_vector / 100))) + oecd.X)
 
-        assert np.array_equal(oecd._shock(model='leontief', custom_shock_vector=custom_shock_vector),
+        assert np.allclose(oecd._shock(model='leontief', custom_shock_vector=custom_shock_vector),
                               ((np.eye(oecd.rs) - oecd.A).I @ (
                                       oecd.FD * (custom_shock_vector / 100))) + oecd.X)
 
@@ -58,10 +77,10 @@ class TestOECD:
             oecd._shock(model='leontief')
 
         shock_vector = np.array([-.1 if r in EA and s == '35' else 0 for r, s in oecd.X.rows]).reshape(-1, 1)
-        assert np.array_equal(oecd._shock(model='ghosh', shock=-10, regions=EA, sectors=['35']),
+        assert np.allclose(oecd._shock(model='ghosh', shock=-10, regions=EA, sectors=['35']),
                               (oecd.G.T @ (oecd.V.T * (shock_vector.astype('float64')))) + oecd.X)
 
-        assert np.array_equal(oecd._shock(model='leontief', shock=-10, regions=EA, sectors=['35']),
+        assert np.allclose(oecd._shock(model='leontief', shock=-10, regions=EA, sectors=['35']),
                               ((np.eye(oecd.rs) - oecd.A).I @ (
                                       oecd.FD * shock_vector.astype('float64'))) + oecd.X)
 
@@ -84,6 +103,51 @@ class TestOECD:
             oecd.ghosh_supply_shock(shock=-10, regions=EA, sectors=['35']).x_new.values.reshape(-1, 1),
             oecd._shock(model='ghosh', shock=-10, regions=EA, sectors=['35']))
 
+    def test_shock_batch(self):
+        shocks = np.hstack([custom_shock_vector, -custom_shock_vector])
+        x_new = oecd.leontief_demand_shock_batch(shocks, as_frame=False)
+        assert x_new.shape == (oecd.rs, 2)
+        assert np.allclose(x_new[:, [1]], oecd._shock(model='leontief', custom_shock_vector=-custom_shock_vector))
+
+        df = oecd.ghosh_supply_shock_batch([(-10, EA, ['35']), (10, EA, ['35'])], scenario_ids=['down', 'up'])
+        assert np.allclose(df[df.scenario == 'down'].x_new.values,
+                           oecd.ghosh_supply_shock(shock=-10, regions=EA, sectors=['35']).x_new.values)
+
+        with pytest.raises(AssertionError):
+            oecd.leontief_demand_shock_batch(shocks, scenario_ids=['one'])
+
+    def test_price_shock(self):
+        v = oecd.V.flatten() / oecd._x_filled().flatten()
+        df = oecd.price_shock(custom_shock_vector=np.zeros(oecd.rs))
+        assert np.allclose(df.p_new[oecd.X.flatten() > 0], 1)
+
+        df = oecd.price_shock(shock=50, regions=EA, sectors=['35'])
+        shock = np.where(oecd.X.row_index.mask(regions=EA, sectors=['35']), 0.5, 0)
+        assert np.allclose(df.p_new, 1 + np.asarray(oecd.L).T @ (v * shock))
+
+        shocks = np.hstack([custom_shock_vector, -custom_shock_vector])
+        p_new = oecd.price_shock_batch(shocks, as_frame=False)
+        assert p_new.shape == (oecd.rs, 2)
+        assert np.allclose(p_new[:, 1], oecd.price_shock(custom_shock_vector=-custom_shock_vector).p_new)
+
+        # Changed coefficients with the same value added coefficients change the prices before the shock as well
+        j = oecd.X.row_index.positions(regions=['NL'], sectors=['35'])
+        delta = np.zeros((oecd.rs, oecd.rs))
+        delta[:, j] = -oecd.A[:, j] / 2
+        L_new = np.linalg.inv(np.eye(oecd.rs) - oecd.A - delta)
+        df = oecd.price_shock(shock=50, regions=EA, sectors=['35'], solver=oecd.updated_solver(delta))
+        assert np.allclose(df.p, L_new.T @ v)
+        assert np.allclose(df.p_new, L_new.T @ (v * (1 + shock)))
+
+    def test_sparse(self):
+        for method in ['splu', 'gmres', 'neumann']:
+            o = OECD(version='2021', year=2018, sparse=method)
+            assert np.allclose(o._shock(model='leontief', custom_shock_vector=custom_shock_vector),
+                               oecd._shock(model='leontief', custom_shock_vector=custom_shock_vector))
+            assert np.allclose(o._shock(model='ghosh', custom_shock_vector=custom_shock_vector),
+                               oecd._shock(model='ghosh', custom_shock_vector=custom_shock_vector))
+            assert o._A is None and o._L is None
+
     def test_plot(self):
         fig, ax = oecd.ghosh_supply_shock(shock=-10, regions=EA, sectors=['35'], plot_regions=EA, plot=True, show=False)
         assert isinstance(fig, matplotlib.figure.Figure)
@@ -147,3 +211,132 @@ class TestOECD:
                                  export_sectors='01T02',
                                  import_sectors='03',
                                  use_type='both')
+
+    def test_get_trade_matrix(self):
+        df = oecd.get_trade_matrix(use_type='both')
+        assert np.isclose(df.loc['AU', ['CN', 'CN1', 'CN2']].sum(), 27117.093 + 85486.566)
+        assert np.isclose(df.loc['AU', 'CN1'], oecd.get_imports_exports(import_regions='CN1', export_regions='AU',
+                                                                         use_type='intermediate'))
+
+        df = oecd.get_trade_matrix(use_type='final', by='region-sector')
+        assert np.isclose(df.loc[('AU', '01T02'), 'CN'], oecd.get_imports_exports(import_regions='CN',
+                                                                                  export_regions='AU',
+                                                                                  export_sectors='01T02',
+                                                                                  use_type='final'))
+
+        with pytest.raises(AssertionError):
+            oecd.get_trade_matrix(by='sector')
+
+    def test_aggregate(self):
+        agg = oecd.aggregate(region_map={r: 'EA' for r in EA}, sector_map=oecd_sector_name_mapping_simple)
+        assert 'EA' in agg.regions and not set(EA).intersection(agg.regions)
+        assert agg.rs == len(agg.Z.rows) < oecd.rs
+        assert np.isclose(agg.X.sum(), oecd.X.sum())
+        assert np.isclose(agg.get_imports_exports(import_regions='CN', export_regions='EA'),
+                          oecd.get_imports_exports(import_regions='CN', export_regions=EA))
+        assert np.isclose(agg.L @ agg.FD, agg.X, atol=.001).all()
+
+    def test_panel(self):
+        panel = Panel(database='oecd', version='2021', years=[2014, 2017, 2018], inverses=True, max_workers=2)
+        assert panel.Z.shape == panel.L.shape == (3, oecd.rs, oecd.rs)
+        assert panel.rows == oecd.Z.rows
+        assert np.array_equal(panel.Z[panel.year_index(2018)], oecd.Z)
+        assert np.allclose(panel.L[panel.year_index(2018)], oecd.L)
+        Panel(database='oecd', version='2021', years=[2017, 2018], max_workers=1)
+        assert OECD._load_data.cache_info().currsize == 0
+
+        with pytest.raises(AssertionError):
+            Panel(database='oecd', version='2021', years=[1990])
+
+    def test_extract_years(self):
+        OECD(version='2021', year=2015, refresh=True)
+        assert extract_years(version='2021', years=[2015, 2016, 2017]) == [2016, 2017]
+        assert extract_years(version='2021', years=[2016]) == []
+
+    def test_read_icio_csv(self):
+        with ZipFile(data_file('2021', 2018)) as zf:
+            with zf.open(csv_filename('2021', 2018)) as csv_file:
+                df = read_icio_csv(csv_file)
+            with zf.open(csv_filename('2021', 2018)) as csv_file:
+                df_pandas = pd.read_csv(csv_file, index_col=0)
+        pd.testing.assert_frame_equal(df, df_pandas)
+        assert split_labels(['MEX_01T02', 'CN1_35']) == [('MX', '01T02'), ('CN1', '35')]
+
+    def test_low_memory(self):
+        o = OECD(version='2021', year=2018, low_memory=True)
+        assert o.df is None and o.memory_saved > 0
+        for attr in ['Z', 'FD_GRAN', 'X', 'V', 'FD_REGION']:
+            assert np.array_equal(getattr(o, attr), getattr(oecd, attr))
+            assert getattr(o, attr).rows == getattr(oecd, attr).rows
+        assert np.array_equal(o.ADD['VA'], oecd.ADD['VA'])
+        assert np.array_equal(o.ADD['TLS'], oecd.ADD['TLS'])
+
+    def test_dtype_cache(self):
+        OECD(version='2021', year=2018, dtype='float32', cache_inverses=True).L
+        assert OECD(version='2021', year=2018, dtype='float32', cache_inverses=True).L.dtype == np.float32
+        o = OECD(version='2021', year=2018, dtype='float32', mmap=True)
+        assert o.L.dtype == o.G.dtype == np.float32
+
+    def test_dtype(self):
+        shocks = np.random.uniform(size=(oecd.rs, 3), low=-10, high=10)
+        x = oecd.leontief_demand_shock_batch(shocks, as_frame=False)
+        o = OECD(version='2021', year=2018, dtype='float32')
+        assert o.Z.dtype == o.A.dtype == o.L.dtype == np.float32
+        assert np.allclose(o.leontief_demand_shock_batch(shocks, as_frame=False), x, rtol=1e-4)
+        o = OECD(version='2021', year=2018, dtype='float32', refine=True)
+        assert np.allclose(o.leontief_demand_shock_batch(shocks, as_frame=False), x, rtol=1e-6)
+        assert np.allclose(o.ghosh_supply_shock_batch(shocks, as_frame=False),
+                           oecd.ghosh_supply_shock_batch(shocks, as_frame=False), rtol=1e-6)
+
+    def test_updated_solver(self):
+        j = oecd.X.row_index.positions(regions=['NL'], sectors=['35'])
+        delta = np.zeros((oecd.rs, oecd.rs))
+        delta[:, j] = -oecd.A[:, j] / 2
+        L_new = np.linalg.inv(np.eye(oecd.rs) - oecd.A - delta)
+        solver = oecd.updated_solver(delta)
+        assert np.allclose(solver.inverse(), L_new)
+        df = oecd.leontief_demand_shock(shock=-10, regions=['NL'], sectors=['35'], solver=solver)
+        shock_vector = oecd._shock_vector(shock=-10, regions=['NL'], sectors=['35'])
+        assert np.allclose(df.x_new, (L_new @ (oecd.FD * (1 + shock_vector))).flatten())
+        assert np.allclose(oecd.leontief_demand_shock_batch(np.zeros((oecd.rs, 1)), as_frame=False,
+                                                            solver=oecd.updated_solver(np.zeros((oecd.rs, oecd.rs)))),
+                           oecd.X)
+
+        # The output before the shock follows from the changed coefficients, so a zero shock changes nothing
+        df = oecd.leontief_demand_shock(custom_shock_vector=np.zeros(oecd.rs), solver=solver)
+        assert np.allclose(df.x, (L_new @ oecd.FD).flatten()) and np.allclose(df.x_new, df.x)
+        df = oecd.leontief_demand_shock_batch(np.zeros((oecd.rs, 2)), solver=solver)
+        assert np.allclose(df.x_new, df.x)
+        delta_B = np.zeros((oecd.rs, oecd.rs))
+        delta_B[j] = -oecd.B[j] / 2
+        df = oecd.ghosh_supply_shock(custom_shock_vector=np.zeros(oecd.rs),
+                                     solver=oecd.updated_solver(delta_B, model='ghosh'))
+        assert np.allclose(df.x_new, df.x) and not np.allclose(df.x, oecd.X.flatten())
+
+    def test_hypothetical_extraction(self):
+        A, FD = np.asarray(oecd.A), oecd.FD.flatten()
+
+        def extracted_output(J):
+            keep = np.setdiff1d(np.arange(oecd.rs), J)
+            x = np.zeros(oecd.rs)
+            x[keep] = np.linalg.solve(np.eye(len(keep)) - A[np.ix_(keep, keep)], FD[keep])
+            return x
+
+        df = oecd.hypothetical_extraction(regions=['NL'], sectors=['35', '64T66'])
+        assert len(df) == 2
+        for J, loss in zip(oecd.X.row_index.positions(regions=['NL'], sectors=['35', '64T66']), df.loss):
+            assert np.isclose(loss, np.linalg.solve(np.eye(oecd.rs) - A, FD).sum() - extracted_output([J]).sum())
+
+        df = oecd.hypothetical_extraction(regions=['NL'], joint=True)
+        assert np.allclose(df.x_new, extracted_output(oecd.X.row_index.positions(regions=['NL'])))
+
+    def test_linkages(self):
+        df = oecd.linkages()
+        assert oecd.linkages() is df
+        assert np.allclose(df.output_multiplier, oecd.L.sum(0))
+        assert np.allclose(df.forward_linkage, oecd.G.sum(1))
+        assert np.allclose(df.backward_index.mean(), 1) and np.allclose(df.forward_index.mean(), 1)
+        va_coefficients = oecd.V.flatten() / oecd._x_filled().flatten()
+        assert np.allclose(df.va_multiplier, va_coefficients @ oecd.L)
+        nl = oecd.X.row_index.mask(regions=['NL'])
+        assert np.allclose(df.domestic_va_multiplier[nl], va_coefficients[nl] @ oecd.L[np.ix_(nl, nl)])
@@ -0,0 +1,88 @@
+"""  Created on 17/10/2026::
+------------- test_solver -------------
+**Authors**: W. Wakker
+
+"""
+from iopy.core.solver import LUSolver, SparseSolver, WoodburySolver
+from scipy import sparse
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(0)
+A = rng.uniform(size=(20, 20)) / 40
+A[A < .015] = 0
+b = rng.uniform(size=(20, 3))
+L = np.linalg.inv(np.eye(20) - A)
+solver = LUSolver(A)
+
+
+class TestLUSolver:
+
+    def test_solve(self):
+        assert np.allclose(solver.solve(b), L @ b)
+        assert np.allclose(solver.solve(b[:, 0]), L @ b[:, 0])
+
+    def test_solve_transposed(self):
+        assert np.allclose(solver.solve(b, trans=True), L.T @ b)
+
+    def test_inverse(self):
+        assert np.allclose(solver.inverse(), L)
+
+    def test_square(self):
+        with pytest.raises(AssertionError):
+            LUSolver(np.ones((2, 3)))
+
+
+class TestSparseSolver:
+
+    @pytest.mark.parametrize('method', SparseSolver.methods)
+    def test_solve(self, method):
+        s = SparseSolver(sparse.csr_matrix(A), method=method)
+        assert np.allclose(s.solve(b), L @ b)
+        assert np.allclose(s.solve(b, trans=True), L.T @ b)
+        assert np.allclose(s.solve(b[:, 0]), L @ b[:, 0])
+
+    def test_inverse(self):
+        assert np.allclose(SparseSolver(A).inverse(), L)
+
+    def test_method(self):
+        with pytest.raises(ValueError):
+            SparseSolver(A, method='something')
+
+    def test_not_converged(self):
+        with pytest.warns(UserWarning):
+            SparseSolver(A, method='neumann', maxiter=1).solve(b)
+
+
+class TestLUSolverFloat32:
+
+    def test_solve(self):
+        s = LUSolver(A.astype(np.float32))
+        assert s.solve(b).dtype == np.float32 and s.inverse().dtype == np.float32
+        assert np.allclose(s.solve(b), L @ b, rtol=1e-5)
+
+    def test_refine(self):
+        # Refinement removes the error of the float32 solve, only the rounding of A to float32 remains
+        A32 = A.astype(np.float32)
+        x = LUSolver(A32, refine=True, block_size=7).solve(b, trans=True)
+        assert x.dtype == np.float64
+        assert np.allclose(x, np.linalg.solve((np.eye(20) - A32.astype(np.float64)).T, b), rtol=1e-12)
+
+    def test_not_converged(self):
+        with pytest.warns(UserWarning):
+            LUSolver(A.astype(np.float32), refine=True, tol=0, maxiter=1).solve(b)
+
+
+class TestWoodburySolver:
+
+    def test_solve(self):
+        U = rng.uniform(size=(20, 2)) / 40
+        V = np.zeros((20, 2))
+        V[[3, 11], [0, 1]] = 1
+        L_new = np.linalg.inv(np.eye(20) - A - U @ V.T)
+        for base in [solver, SparseSolver(A)]:
+            s = WoodburySolver(base, U, V)
+            assert np.allclose(s.solve(b), L_new @ b)
+            assert np.allclose(s.solve(b, trans=True), L_new.T @ b)
+            assert np.allclose(s.solve(b[:, 0]), L_new @ b[:, 0])
+            assert np.allclose(s.inverse(), L_new)
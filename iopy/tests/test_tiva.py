@@ -0,0 +1,44 @@
+"""  Created on 17/10/2026::
+------------- test_tiva -------------
+**Authors**: W. Wakker
+
+"""
+from iopy import OECD
+from iopy.core import tiva
+import numpy as np
+
+oecd = OECD(version='2021', year=2018)
+A, L = np.asarray(oecd.A), np.asarray(oecd.L)
+v = oecd.V.flatten() / oecd._x_filled().flatten()
+codes, countries = tiva.countries(oecd)
+S = np.eye(len(countries))[codes].T
+
+
+class TestTiVA:
+
+    def test_countries(self):
+        assert countries == list(oecd.FD_REGION.columns)
+        assert countries[codes[oecd.X.row_index.positions(regions=['CN1'])[0]]] == 'CN'
+
+    def test_gross_exports(self):
+        df = tiva.gross_exports(oecd)
+        nl = oecd.X.row_index.positions(regions=['NL'])
+        assert np.allclose(df.loc['NL'].sum().sum(),
+                           oecd.get_trade_matrix().loc['NL'].drop('NL').sum())
+        assert np.allclose(df.to_numpy()[nl, countries.index('NL')], 0)
+
+    def test_va_in_exports(self):
+        exports = tiva.gross_exports(oecd).to_numpy().sum(1)
+        dense = S @ (v[:, None] * L * exports[None, :]) @ S.T
+        assert np.allclose(tiva.va_in_exports(oecd).to_numpy(), dense.T)
+        assert np.allclose(tiva.va_in_exports(oecd, by='region-sector').sum(1), exports)
+
+    def test_decompose_exports(self):
+        df = tiva.decompose_exports(oecd)
+        assert np.allclose(df.dva + df.fva, df.exports)
+        assert np.allclose(df.vax + df.rdv + df.ddc, df.dva)
+        assert (df.ddc > -1e-6).all()
+
+        # Value added exports add up to the world value added absorbed abroad
+        absorbed = v[:, None] * (L @ np.asarray(oecd.FD_REGION))
+        assert np.isclose(df.vax.sum(), absorbed.sum() - absorbed[np.arange(oecd.rs), codes].sum())